@@ -4,7 +4,26 @@ Date: 9/22/2021
 Description: Functions relating to combinations.
 """
 
-from math import factorial
+from array import array
+
+
+# Tables of n! mod p and (n!)^-1 mod p for every modulus p used by ncrMod,
+# grown as needed so repeated calls with the same p reuse them.  They are
+# stored as arrays of 64-bit integers, i.e., 16 bytes per entry for both,
+# when p fits, and as lists otherwise.
+factorialTables = {}
+inverseFactorialTables = {}
+
+# The multiplicative work, i.e., the sum of r, spent by ncrMod for every
+# modulus p since its tables were last extended.  The tables are extended
+# to n once this work reaches the number of missing entries, so one-off
+# calls take O(r) time while repeated calls build the tables once.
+factorialWork = {}
+
+# The largest length that ncrMod grows the tables to on its own, about
+# 256 MiB for both tables.  (n r) mod p for a larger n is calculated with
+# the multiplicative formula unless extendFactorialTables was called.
+FACTORIAL_TABLE_LIMIT = 1 << 24
 
 
 def ncr(n, r):
@@ -13,5 +32,463 @@ def ncr(n, r):
     and returns (n r) = n! / r!(n - r)!
     """
 
-    # Calculate and return (n r).
-    return factorial(n) / (factorial(r) * factorial(n - r))
+    # Check if r is out of range.
+    if r < 0 or r > n:
+        return 0
+
+    r = min(r, n - r)  # Use the symmetry (n r) = (n n - r).
+    result = 1  # Start with (n 0) = 1.
+
+    # Calculate (n i + 1) = (n i) * (n - i) / (i + 1) for all i < r.  The
+    # division is exact, since (n i) * (n - i) = (n i + 1) * (i + 1).
+    for i in range(r):
+        result = result * (n - i) // (i + 1)
+
+    return result  # Return (n r).
+
+
+def extendFactorialTables(n, p):
+    """
+    Takes as input a non-negative integer, n, and a prime, p, then returns
+    the tables of k! mod p and (k!)^-1 mod p for all k <= min(n, p - 1),
+    extending the cached tables for p if they are too short.  Call it
+    directly to size the tables before many calls of ncrMod with mod p.
+    """
+    n = min(n, p - 1)  # k! mod p is 0 for k >= p, so stop at p - 1.
+
+    # Check if the tables for p have to be created.
+    if p not in factorialTables:
+        factorialTables[p] = array("q", [1]) if p < 1 << 63 else [1]
+        inverseFactorialTables[p] = factorialTables[p][:]
+
+    fact = factorialTables[p]  # The table of k! mod p.
+    inverse = inverseFactorialTables[p]  # The table of (k!)^-1 mod p.
+
+    # Check if the tables need to be extended.
+    if len(fact) <= n:
+        start = len(fact)  # The first new entry.
+
+        # Extend the table of factorials.
+        newFact = [fact[-1]]
+        for k in range(start, n + 1):
+            newFact.append(newFact[-1] * k % p)
+        fact.extend(newFact[1:])
+
+        # Invert only the largest new factorial with Fermat's little
+        # theorem, then walk down with (k - 1)!^-1 = k!^-1 * k.
+        newInverse = [0] * (n + 1 - start)
+        newInverse[-1] = pow(fact[n], p - 2, p)
+        for k in range(n, start, -1):
+            newInverse[k - start - 1] = newInverse[k - start] * k % p
+        inverse.extend(newInverse)
+
+        factorialWork[p] = 0  # The tables are up to date again.
+
+    return fact, inverse  # Return the tables.
+
+
+def ncrMod(n, r, p):
+    """
+    Takes as input two non-negative integers, n and r, and a prime, p,
+    then calculates and returns (n r) mod p.  Uses the cached tables of
+    factorials and inverse factorials mod p if n < p, extending them to n
+    once the calls with mod p have spent as much multiplicative work as
+    the extension costs, the multiplicative formula with one modular
+    inverse until then, and Lucas's theorem on the base p digits of n and
+    r if n >= p.
+    """
+
+    # Check if r is out of range.
+    if r < 0 or r > n:
+        return 0
+
+    # Check if n is too large for the factorial tables, then use Lucas.
+    if n >= p:
+        return lucas(n, r, p)
+
+    r = min(r, n - r)  # Use the symmetry (n r) = (n n - r).
+    missing = n + 1 - len(factorialTables.get(p, ()))  # Entries to build.
+
+    # Check if the tables do not cover n and are not worth extending yet,
+    # then calculate (n r) = n(n - 1)...(n - r + 1) * (r!)^-1 mod p.
+    if missing > 0 and (n >= FACTORIAL_TABLE_LIMIT or
+                        factorialWork.get(p, 0) + r < missing):
+        factorialWork[p] = factorialWork.get(p, 0) + r  # Count the work.
+        numerator = denominator = 1
+        for i in range(r):
+            numerator = numerator * (n - i) % p
+            denominator = denominator * (i + 1) % p
+        return numerator * pow(denominator, p - 2, p) % p
+
+    # Calculate (n r) = n! * (r!)^-1 * ((n - r)!)^-1 mod p.
+    fact, inverse = extendFactorialTables(n, p)
+    return fact[n] * inverse[r] % p * inverse[n - r] % p
+
+
+def lucas(n, r, p):
+    """
+    Takes as input two non-negative integers, n and r, and a prime, p,
+    then calculates and returns (n r) mod p using Lucas's theorem, i.e.,
+    the product of (n_i r_i) mod p over the base p digits n_i and r_i.
+    """
+    result = 1  # Start with the empty product.
+
+    # Loop over the base p digits of n and r.
+    while r and result:
+        n, ni = divmod(n, p)  # Get the next digit of n.
+        r, ri = divmod(r, p)  # Get the next digit of r.
+        result = result * ncrMod(ni, ri, p) % p  # Multiply by (n_i r_i).
+
+    return result  # Return (n r) mod p.
+
+
+def pascalRow(n, p=None):
+    """
+    Takes as input a non-negative integer, n, and an optional prime, p,
+    then calculates and returns the list [(n 0), (n 1), ..., (n n)], or
+    those values mod p if p is given.  Each entry is calculated from the
+    previous one, and only half of the row is calculated by symmetry.
+    """
+
+    # Check if the row should be calculated mod p with Lucas's theorem.
+    if p is not None and n >= p:
+        return [ncrMod(n, r, p) for r in range(n + 1)]
+
+    # Check if the row should be calculated mod p, where the inverses of
+    # 1, ..., n / 2 are found in O(n) time with i^-1 = -(p // i) *
+    # (p mod i)^-1 mod p, since p mod i < i.
+    if p is not None:
+        inverse = [0, 1] + [0] * (n >> 1)
+        for i in range(2, (n >> 1) + 1):
+            inverse[i] = (p - p // i) * inverse[p % i] % p
+        row = [1] * (n + 1)
+        for r in range(n >> 1):
+            row[r + 1] = row[n - r - 1] = \
+                row[r] * (n - r) % p * inverse[r + 1] % p
+        return row
+
+    row = [1] * (n + 1)  # The row of Pascal's triangle.
+
+    # Calculate (n r + 1) = (n r) * (n - r) / (r + 1) for the
+    # first half of the row and mirror it to the second half.
+    for r in range(n >> 1):
+        row[r + 1] = row[n - r - 1] = row[r] * (n - r) // (r + 1)
+
+    return row  # Return the row of Pascal's triangle.
+
+
+def lexicographicCombinationRank(c, n):
+    """
+    Takes as input an increasing list of k integers in [0, n), c, and a
+    positive integer, n, then calculates and returns the 0-indexed rank of
+    c among all k-combinations of [0, n) in lexicographic order.
+    """
+    k = len(c)  # The size of the combination.
+
+    # Count the combinations after c, i.e., the ones that agree with c
+    # up to some position i and then are larger, and subtract them.
+    return ncr(n, k) - 1 - sum(ncr(n - 1 - x, k - i)
+                               for i, x in enumerate(c))
+
+
+def lexicographicCombinationUnrank(rank, n, k):
+    """
+    Takes as input three non-negative integers, rank, n, and k, then
+    calculates and returns the k-combination of [0, n) with 0-indexed rank
+    rank in lexicographic order as an increasing list, or None if there
+    is no such combination.
+    """
+
+    # Make sure there is a combination with rank rank.
+    if not 0 <= rank < ncr(n, k):
+        return None
+
+    c = []  # A list to store the combination.
+    x = 0  # The smallest element that can be placed next.
+
+    # Loop for every position of the combination.
+    for i in range(k):
+
+        # Skip the elements whose block of combinations is before rank,
+        # i.e., the ncr(n - 1 - x, k - 1 - i) combinations starting with x.
+        while rank >= (count := ncr(n - 1 - x, k - 1 - i)):
+            rank -= count
+            x += 1
+
+        c.append(x)  # Place x.
+        x += 1  # The next element must be larger.
+
+    return c  # Return the combination.
+
+
+def lexicographicCombinations(n, k, start=0):
+    """
+    Takes as input two non-negative integers, n and k, and an optional
+    rank, start, then generates the k-combinations of [0, n) in
+    lexicographic order, starting from the one with rank start.  The same
+    increasing list is yielded every time, mutated in place, so copy it if
+    a combination needs to be kept.
+    """
+
+    # Get the first combination and check if there is one.
+    if (c := lexicographicCombinationUnrank(start, n, k)) is None:
+        return
+
+    # Loop until there are no more combinations.
+    while True:
+        yield c  # Yield the current combination.
+        i = k - 1  # Start at the last position.
+
+        # Loop from the end to find the last position that can be increased.
+        while i >= 0 and c[i] == n - k + i:
+            i -= 1
+
+        # Check if no position can be increased.
+        if i < 0:
+            return  # Stop the generator.
+
+        c[i] += 1  # Increase the position.
+
+        # Reset every later position to the smallest values after it.
+        for j in range(i + 1, k):
+            c[j] = c[j - 1] + 1
+
+
+def colexCombinationRank(c):
+    """
+    Takes as input an increasing list of integers, c, then calculates and
+    returns the 0-indexed rank of c among all combinations of its size in
+    colexicographic order, i.e., the sum of ncr(c[i], i + 1).
+    """
+    return sum(ncr(x, i + 1) for i, x in enumerate(c))  # Return the rank.
+
+
+def colexCombinationUnrank(rank, n, k):
+    """
+    Takes as input three non-negative integers, rank, n, and k, then
+    calculates and returns the k-combination of [0, n) with 0-indexed rank
+    rank in colexicographic order as an increasing list, or None if there
+    is no such combination.
+    """
+
+    # Make sure there is a combination with rank rank.
+    if not 0 <= rank < ncr(n, k):
+        return None
+
+    c = [0] * k  # A list to store the combination.
+    x = n - 1  # The largest element that can be placed next.
+
+    # Loop for every position from the last to the first.
+    for i in range(k - 1, -1, -1):
+
+        # Find the largest x with ncr(x, i + 1) <= rank.
+        while ncr(x, i + 1) > rank:
+            x -= 1
+
+        c[i] = x  # Place x.
+        rank -= ncr(x, i + 1)  # Remove its part of the rank.
+        x -= 1  # The next element must be smaller.
+
+    return c  # Return the combination.
+
+
+def colexCombinations(n, k, start=0):
+    """
+    Takes as input two non-negative integers, n and k, and an optional
+    rank, start, then generates the k-combinations of [0, n) in
+    colexicographic order, starting from the one with rank start.  The
+    same increasing list is yielded every time, mutated in place, so copy
+    it if a combination needs to be kept.
+    """
+
+    # Get the first combination and check if there is one.
+    if (c := colexCombinationUnrank(start, n, k)) is None:
+        return
+
+    # Loop until there are no more combinations.
+    while True:
+        yield c  # Yield the current combination.
+        j = 0  # Start at the first position.
+
+        # Loop to find the first position that can be increased.
+        while j < k and c[j] + 1 == (c[j + 1] if j + 1 < k else n):
+            j += 1
+
+        # Check if no position can be increased.
+        if j == k:
+            return  # Stop the generator.
+
+        c[j] += 1  # Increase the position.
+
+        # Reset every earlier position to its smallest value.
+        for i in range(j):
+            c[i] = i
+
+
+def revolvingDoorRank(c):
+    """
+    Takes as input an increasing list of integers, c, then calculates and
+    returns the 0-indexed rank of c among all combinations of its size in
+    revolving door order, using the alternating sum of ncr(c[i] + 1, i + 1).
+    """
+    k = len(c)  # The size of the combination.
+    rank = -(k & 1)  # Start at -1 if k is odd and 0 otherwise.
+    sign = 1  # The sign of the next term.
+
+    # Loop for every position from the last to the first.
+    for i in range(k - 1, -1, -1):
+        rank += sign * ncr(c[i] + 1, i + 1)  # Add the term.
+        sign = -sign  # Alternate the sign.
+
+    return rank  # Return the rank.
+
+
+def revolvingDoorUnrank(rank, n, k):
+    """
+    Takes as input three non-negative integers, rank, n, and k, then
+    calculates and returns the k-combination of [0, n) with 0-indexed rank
+    rank in revolving door order as an increasing list, or None if there
+    is no such combination.
+    """
+
+    # Make sure there is a combination with rank rank.
+    if not 0 <= rank < ncr(n, k):
+        return None
+
+    c = [0] * k  # A list to store the combination.
+    x = n  # One more than the largest element that can be placed next.
+
+    # Loop for every position from the last to the first.
+    for i in range(k, 0, -1):
+
+        # Find the largest x with ncr(x, i) <= rank.
+        while ncr(x, i) > rank:
+            x -= 1
+
+        c[i - 1] = x  # Place x, i.e., the element x + 1 counting from 1.
+        rank = ncr(x + 1, i) - rank - 1  # Reflect the rest of the rank.
+
+    return c  # Return the combination.
+
+
+def revolvingDoorCombinations(n, k, start=0):
+    """
+    Takes as input two non-negative integers, n and k, and an optional
+    rank, start, then generates the k-combinations of [0, n) in revolving
+    door order, starting from the one with rank start.  Each combination
+    differs from the previous one by removing one element and adding
+    another, so 3-tuples (c, removed, added) are yielded, where removed and
+    added are None for the first combination.  The same increasing list,
+    c, is yielded every time, mutated in place, so copy it if a combination
+    needs to be kept.
+    """
+
+    # Get the first combination and check if there is one.
+    if (c := revolvingDoorUnrank(start, n, k)) is None:
+        return
+
+    yield c, None, None  # Yield the first combination.
+
+    # Loop for every remaining combination.
+    for _ in range(ncr(n, k) - start - 1):
+        j = 0  # Start at the first position.
+
+        # Loop to find the first position not holding its smallest value.
+        while j < k and c[j] == j:
+            j += 1
+
+        changes = []  # The positions to change and their new values.
+
+        # Check if k - j is even, counting positions from 0.
+        if not (k - j) & 1:
+
+            # Lower the first element, or move the two positions before j
+            # down to their smallest values.
+            if j == 0:
+                changes = [(0, c[0] - 1)]
+            else:
+                changes = [(j - 1, j)] + ([(j - 2, j - 1)] if j > 1 else [])
+
+        # Check if the element after position j is not adjacent to it.
+        elif (c[j + 1] if j + 1 < k else n) != c[j] + 1:
+
+            # Move position j up and the position before it up to c[j].
+            changes = ([(j - 1, c[j])] if j else []) + [(j, c[j] + 1)]
+        else:
+
+            # Move c[j] to position j + 1 and position j to its smallest.
+            changes = [(j + 1, c[j])] if j + 1 < k else []
+            changes += [(j, j)]
+
+        # Find the element removed and the element added by the changes.
+        old = {c[i] for i, _ in changes}
+        new = {value for _, value in changes}
+        removed, = old - new
+        added, = new - old
+
+        # Apply the changes.
+        for i, value in changes:
+            c[i] = value
+
+        yield c, removed, added  # Yield the next combination.
+
+
+def grayCodeRank(subset):
+    """
+    Takes as input a list of booleans, subset, where subset[i] is True if
+    element i is in the subset, then calculates and returns the 0-indexed
+    rank of the subset in binary reflected Gray code order.
+    """
+    code = sum(1 << i for i, inSubset in enumerate(subset) if inSubset)
+    rank = 0  # The rank of the subset.
+
+    # Convert the Gray code to binary by XORing all of its shifts.
+    while code:
+        rank ^= code
+        code >>= 1
+
+    return rank  # Return the rank.
+
+
+def grayCodeUnrank(rank, n):
+    """
+    Takes as input two non-negative integers, rank and n, then calculates
+    and returns the subset of [0, n) with 0-indexed rank rank in binary
+    reflected Gray code order as a list of booleans, or None if there is
+    no such subset.
+    """
+
+    # Make sure there is a subset with rank rank.
+    if not 0 <= rank < 1 << n:
+        return None
+
+    code = rank ^ (rank >> 1)  # The Gray code of the rank.
+    return [bool(code >> i & 1) for i in range(n)]  # Return the subset.
+
+
+def grayCodeSubsets(n, start=0):
+    """
+    Takes as input a non-negative integer, n, and an optional rank, start,
+    then generates the subsets of [0, n) in binary reflected Gray code
+    order, starting from the one with rank start.  Each subset differs from
+    the previous one by adding or removing one element, so 2-tuples
+    (subset, flipped) are yielded, where flipped is the element added or
+    removed, or None for the first subset.  The same list of booleans,
+    subset, is yielded every time, mutated in place, so copy it if a
+    subset needs to be kept.
+    """
+
+    # Get the first subset and check if there is one.
+    if (subset := grayCodeUnrank(start, n)) is None:
+        return
+
+    yield subset, None  # Yield the first subset.
+
+    # Loop for every remaining rank.
+    for rank in range(start + 1, 1 << n):
+
+        # Flip the element given by the number of trailing zeros of rank.
+        flipped = (rank & -rank).bit_length() - 1
+        subset[flipped] = not subset[flipped]
+
+        yield subset, flipped  # Yield the next subset.
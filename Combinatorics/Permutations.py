@@ -4,41 +4,167 @@ Date: 7/29/2021
 Description: Functions relating to permutations.
 """
 
-
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from itertools import permutations
+from math import factorial
 
 
-def nextLexicographicPermutations(s):
+def _nextPermutation(s):
+    """
+    Takes as input a list, s, then rearranges s in place into the next
+    lexicographic permutation of s using only swaps.  Returns True if
+    there was a next permutation and False otherwise.
+    """
+    i = j = len(s) - 1  # Set i and j to the last index of the list.
+
+    # Loop from the end of the list representing the string to the
+    # beginning to find the non-increasing suffix.
+    while i > 0 and s[i - 1] >= s[i]:
+        i -= 1  # Decrement the looping variable.
+
+    # Check if i <= 0.  If this is true, there are no more
+    # lexicographic permutations.
+    if i <= 0:
+        return False
+
+    # Loop through from the end of the list representing the
+    # string to the beginning to find the successor to pivot.
+    while s[j] <= s[i - 1]:
+        j -= 1  # Decrement the looping variable.
+
+    s[i - 1], s[j] = s[j], s[i - 1]  # Swap the i-1th and jth elements.
+    j = len(s) - 1  # Set j to the last index of the list.
+
+    # Reverse the suffix in place by swapping its ends inwards.
+    while i < j:
+        s[i], s[j] = s[j], s[i]  # Swap the ith and jth elements.
+        i, j = i + 1, j - 1  # Move i and j towards each other.
+
+    return True  # There was a next permutation.
+
+
+def nextLexicographicPermutations(s, inPlace=False):
     """
     Takes as input s, a string, and generates the next lexicographic
     permutation of s.  The next permutation is yielded and a generator
     can be used to continuously generate the subsequent permutations.
+    If inPlace is True, s may be any sequence and the same list is yielded
+    every time, mutated in place, so no new object is allocated per
+    permutation.  Copy it if a permutation needs to be kept.
     """
     s = list(s)  # Convert the string passed in into a list.
 
     # Loop until there are no more permutations.
+    while _nextPermutation(s):
+
+        # Yield the list itself, or the result after converting to a string.
+        yield s if inPlace else "".join(s)
+
+
+def heapsPermutations(s):
+    """
+    Takes as input a sequence, s, then generates every permutation of s,
+    starting with s itself, using Heap's algorithm, which moves from one
+    permutation to the next with a single swap.  The same list is yielded
+    every time, mutated in place, so copy it if a permutation needs to be
+    kept.  The permutations are not in lexicographic order.
+    """
+    a = list(s)  # The buffer holding the current permutation.
+    c = [0] * len(a)  # The loop counters of the recursive algorithm.
+    i = 1  # The level of the recursion being simulated.
+
+    yield a  # Yield the first permutation, s itself.
+
+    # Loop until every level of the recursion has finished.
+    while i < len(a):
+
+        # Check if level i has more swaps to make.
+        if c[i] < i:
+
+            # Swap the ith element with the first if i is even and
+            # with the c[i]th element if i is odd.
+            k = c[i] if i & 1 else 0
+            a[k], a[i] = a[i], a[k]
+
+            yield a  # Yield the next permutation.
+            c[i] += 1  # Count the swap at level i.
+            i = 1  # Restart from the lowest level.
+        else:
+            c[i] = 0  # Reset the counter of level i.
+            i += 1  # Move up a level.
+
+
+def plainChangesPermutations(s):
+    """
+    Takes as input a sequence, s, then generates every permutation of s,
+    starting with s itself, in plain changes order using the Steinhaus-
+    Johnson-Trotter algorithm with Even's speedup, i.e., each permutation
+    differs from the previous one by a swap of two adjacent elements.  The
+    same list is yielded every time, mutated in place, so copy it if a
+    permutation needs to be kept.
+    """
+    a = list(s)  # The buffer holding the current permutation.
+    n = len(a)  # The number of elements.
+
+    # The permutation of the indices of s in the buffer, the position of
+    # every index in it, and the direction every index is moving in.
+    perm, position, direction = list(range(n)), list(range(n)), [-1] * n
+
+    yield a  # Yield the first permutation, s itself.
+
+    # Loop until there are no more mobile indices.
     while True:
-        i = j = len(s) - 1  # Set i and j to the last index of the list.
 
-        # Loop from the end of the list representing the string to the
-        # beginning to find the non-increasing suffix.
-        while i > 0 and s[i - 1] >= s[i]:
-            i -= 1  # Decrement the looping variable.
+        # Loop from the largest index to the smallest to find the largest
+        # mobile index, i.e., one whose neighbour in its direction is smaller.
+        for v in range(n - 1, -1, -1):
+            i = position[v]  # The position of the index.
+            j = i + direction[v]  # The position it is moving to.
+            if 0 <= j < n and perm[j] < v:
+                break
+        else:
+            return  # Stop the generator, as no index is mobile.
+
+        # Swap the mobile index with its neighbour in the
+        # permutation of indices, their positions, and the buffer.
+        perm[i], perm[j] = perm[j], perm[i]
+        position[perm[i]], position[perm[j]] = i, j
+        a[i], a[j] = a[j], a[i]
+
+        # Reverse the direction of every index larger than the mobile one.
+        for w in range(v + 1, n):
+            direction[w] = -direction[w]
 
-        # Check if i <= 0.  If this is true, there are no more
-        # lexicographic permutations.
-        if i <= 0:
-            return  # Stop the generator.
+        yield a  # Yield the next permutation.
 
-        # Loop through from the end of the list representing the
-        # string to the beginning to find the successor to pivot.
-        while s[j] <= s[i - 1]:
-            j -= 1  # Decrement the looping variable.
 
-        s[i - 1], s[j] = s[j], s[i - 1]  # Swap the i-1th and jth elements.
-        s[i:] = s[len(s)-1: i-1: -1]  # Reverse the suffix.
+def inPlacePermutations(s, order="lexicographic"):
+    """
+    Takes as input a sequence, s, and the name of an order, order, then
+    generates permutations of s starting with s itself, yielding the same
+    list every time, mutated in place.  If order is "lexicographic", the
+    permutations are the ones lexicographically after s, in order.  If
+    order is "heap" or "plain", all permutations of s are generated with
+    Heap's algorithm or with plain changes.  Raises a ValueError for any
+    other order.
+    """
+
+    # Check if the permutations should be in lexicographic order.
+    if order == "lexicographic":
+        a = list(s)  # The buffer holding the current permutation.
 
-        yield "".join(s)  # Yield the result after converting to a string.
+        # Yield s itself, then every following permutation.
+        yield a
+        while _nextPermutation(a):
+            yield a
+    elif order == "heap":
+        yield from heapsPermutations(s)
+    elif order == "plain":
+        yield from plainChangesPermutations(s)
+    else:
+        raise ValueError(f"Unknown order: {order!r}.")
 
 
 def nthLexicographicPermutationPython(s, n):
@@ -52,3 +178,233 @@ def nthLexicographicPermutationPython(s, n):
     # then return the nth permutation if it exists.
     perms = sorted(''.join(c) for c in permutations(s))
     return None if len(perms) < n - 1 else perms[n - 1]
+
+
+def _restore(s, items):
+    """
+    Takes as input a sequence, s, and a list, items, then returns items
+    as a string if s is a string and as a list otherwise.
+    """
+    return "".join(items) if isinstance(s, str) else items
+
+
+def permutationRank(s):
+    """
+    Takes as input a sequence of distinct elements, s, then calculates and
+    returns the 0-indexed lexicographic rank of s among all permutations
+    of its elements using the factorial number system (Lehmer code).
+    """
+    remaining = sorted(s)  # The elements not yet placed, in order.
+    rank = 0  # The rank of s.
+
+    # Loop for every position of s.
+    for i, element in enumerate(s):
+
+        # Add the number of permutations that place a smaller remaining
+        # element at position i, i.e., index * (len(s) - i - 1)!.
+        index = remaining.index(element)
+        rank += index * factorial(len(s) - i - 1)
+        del remaining[index]  # Remove the placed element.
+
+    return rank  # Return the rank of s.
+
+
+def permutationUnrank(s, rank):
+    """
+    Takes as input a sequence of distinct elements, s, and a non-negative
+    integer, rank, then calculates and returns the permutation of s with
+    0-indexed lexicographic rank rank using the factorial number system,
+    or None if there is no such permutation.  Takes O(len(s)^2) time.
+    """
+    remaining = sorted(s)  # The elements not yet placed, in order.
+
+    # Make sure there is a permutation with rank rank.
+    if not 0 <= rank < factorial(len(remaining)):
+        return None
+
+    permutation = []  # A list to store the permutation.
+
+    # Loop for every position, from the most significant digit of the
+    # rank in the factorial number system to the least significant.
+    for i in range(len(remaining) - 1, -1, -1):
+        index, rank = divmod(rank, factorial(i))  # Get the digit.
+        permutation.append(remaining.pop(index))  # Place the element.
+
+    return _restore(s, permutation)  # Return the permutation.
+
+
+def nthLexicographicPermutation(s, n):
+    """
+    Takes as input a sequence of distinct elements, s, and a number, n, and
+    returns the nth lexicographic permutation of s if it exists.  Returns
+    None otherwise.  Unlike nthLexicographicPermutationPython, only the nth
+    permutation is built, so it takes O(len(s)^2) time and O(len(s)) memory.
+    """
+    return permutationUnrank(s, n - 1)  # Unrank the 0-indexed rank.
+
+
+def _multisetPermutations(counts, length):
+    """
+    Takes as input a Counter of elements, counts, whose counts add up to
+    length, then returns the number of distinct permutations of the
+    elements, i.e., the multinomial coefficient length! / prod(count!).
+    """
+    total = factorial(length)  # Start with length!.
+
+    # Divide by count! for every element.
+    for c in counts.values():
+        total //= factorial(c)
+
+    return total  # Return the number of distinct permutations.
+
+
+def multisetPermutationRank(s):
+    """
+    Takes as input a sequence, s, that may contain repeated elements, then
+    calculates and returns the 0-indexed lexicographic rank of s among the
+    distinct permutations of its elements.
+    """
+    counts = Counter(s)  # The number of each element not yet placed.
+    total = _multisetPermutations(counts, len(s))  # Distinct permutations.
+    rank = 0  # The rank of s.
+
+    # Loop for every position of s.
+    for i, element in enumerate(s):
+        remaining = len(s) - i  # The number of elements not yet placed.
+
+        # Loop for every smaller remaining element and add the number of
+        # distinct permutations that place it at position i.
+        for smaller in sorted(counts):
+            if smaller >= element:
+                break
+            rank += total * counts[smaller] // remaining
+
+        # Place the element and update the number of permutations.
+        total = total * counts[element] // remaining
+        counts[element] -= 1
+        if not counts[element]:
+            del counts[element]
+
+    return rank  # Return the rank of s.
+
+
+def multisetPermutationUnrank(s, rank):
+    """
+    Takes as input a sequence, s, that may contain repeated elements, and a
+    non-negative integer, rank, then calculates and returns the distinct
+    permutation of s with 0-indexed lexicographic rank rank, or None if
+    there is no such permutation.
+    """
+    counts = Counter(s)  # The number of each element not yet placed.
+    total = _multisetPermutations(counts, len(s))  # Distinct permutations.
+
+    # Make sure there is a permutation with rank rank.
+    if not 0 <= rank < total:
+        return None
+
+    permutation = []  # A list to store the permutation.
+
+    # Loop for every position, from the first to the last.
+    for remaining in range(len(s), 0, -1):
+
+        # Loop for every remaining element in order.
+        for element in sorted(counts):
+
+            # Calculate the number of distinct permutations
+            # that place the element at this position.
+            count = total * counts[element] // remaining
+
+            # Check if the permutation places the element here.
+            if rank < count:
+                break
+            rank -= count  # Skip the permutations placing the element.
+
+        # Place the element and update the number of permutations.
+        permutation.append(element)
+        total = count
+        counts[element] -= 1
+        if not counts[element]:
+            del counts[element]
+
+    return _restore(s, permutation)  # Return the permutation.
+
+
+def _reduceShard(task):
+    """
+    Takes as input a 6-tuple, task, of a sequence, s, two non-negative
+    integers, lo and hi, two functions, function and reducer, and a 1-tuple
+    holding the start of the reduction, or an empty tuple to start from the
+    first value, start, then returns a list of the reduction with reducer
+    of function applied to every distinct permutation of s with
+    lexicographic rank in [lo, hi), or an empty list if the range is empty.
+    """
+    s, lo, hi, function, reducer, start = task  # Unpack the task.
+
+    # Check if the range is empty.
+    if lo >= hi:
+        return []
+
+    permutation = multisetPermutationUnrank(list(s), lo)  # The start.
+
+    # Start the reduction from start, or from the first value.
+    if start:
+        result = start[0]
+    else:
+        result = function(permutation)
+        _nextPermutation(permutation)
+        lo += 1
+
+    # Loop for every rank in the shard.
+    for _ in range(lo, hi):
+        result = reducer(result, function(permutation))  # Reduce it.
+        _nextPermutation(permutation)  # Move to the next permutation.
+
+    return [result]  # Return the reduction of the shard.
+
+
+def shardedPermutationReduce(s, function, reducer, initial, workers=None,
+                             shardsPerWorker=4, combine=None):
+    """
+    Takes as input a sequence, s, a function of one permutation, function,
+    a function of two arguments, reducer, and an initial value, initial,
+    then returns the reduction with reducer of function applied to every
+    distinct permutation of s, starting from initial.  The lexicographic
+    ranks are split into shardsPerWorker contiguous ranges per worker
+    process (by default, one per CPU).  Each worker unranks the first
+    permutation of its range and steps through the range in place, so the
+    workers never coordinate.  Each range is reduced starting from its
+    first value, and the results of the ranges are combined in order with
+    reducer, starting from initial, so initial is used exactly once.  If
+    combine is given, reducer folds values into an accumulator of another
+    type, so each range starts from initial instead and the results are
+    combined with combine, which requires initial to be an identity of
+    combine, e.g., 0 or [].  function receives a shared list mutated in
+    place, and all functions must be picklable, e.g., module level.
+    """
+
+    # Check if initial can start every range, i.e., it is an identity.
+    if combine is not None and combine(initial, initial) != initial:
+        raise ValueError("initial must be an identity of combine.")
+
+    workers = workers or os.cpu_count() or 1  # Get the number of workers.
+    total = _multisetPermutations(Counter(s), len(s))  # The permutations.
+    shards = min(workers * shardsPerWorker, total)  # The number of shards.
+    start = () if combine is None else (initial,)  # The start of a range.
+
+    # Split the ranks [0, total) into shards of nearly equal size.
+    bounds = [total * i // shards for i in range(shards + 1)]
+    tasks = [(list(s), bounds[i], bounds[i + 1], function, reducer, start)
+             for i in range(shards)]
+
+    # Reduce every shard in a worker process.
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(_reduceShard, tasks)
+
+        result = initial  # Start the reduction from the initial value.
+
+        # Combine the results of the nonempty shards in order.
+        for shardResult in results:
+            for value in shardResult:
+                result = (combine or reducer)(result, value)
+
+    return result  # Return the reduction of every permutation.
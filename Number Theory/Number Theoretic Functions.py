@@ -4,21 +4,279 @@ Date: 6/22/2021
 Description: Number Theoretic Functions
 """
 
-from math import ceil, sqrt, floor
-from operator import mul
-from functools import reduce
+import sys
+from array import array
+from collections import OrderedDict
+from functools import wraps
+from itertools import count
+from math import floor, gcd, isqrt, sqrt
+from random import randrange
 
 
-# A dictionary to memoize the prime factorizations
+class LRUCache:
+    """
+    A class to represent a bounded memoization cache.  Entries are evicted
+    in least recently used order once the cache holds more than maxEntries
+    entries or more than an estimated maxBytes bytes, and the numbers of
+    hits, misses, and evictions are counted for monitoring.
+    """
+
+    def __init__(self, maxEntries=1 << 16, maxBytes=None):
+        """
+        The constructor for the LRUCache class.  Takes as input two optional
+        positive integers, maxEntries and maxBytes, that bound the number of
+        entries and the estimated size in bytes of the cache.  A bound that
+        is None is not enforced.
+        """
+
+        # Initialize the entries, the bounds, the estimated size, and the
+        # counters of the cache.
+        self.entries = OrderedDict()
+        self.maxEntries, self.maxBytes = maxEntries, maxBytes
+        self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        """
+        Takes self as input, then returns the number of entries in the cache.
+        """
+        return len(self.entries)
+
+    def __contains__(self, key):
+        """
+        Takes as input a key, key, then returns True if key is in the cache
+        and False otherwise.  Does not count as a hit or a miss.
+        """
+        return key in self.entries
+
+    def __getitem__(self, key):
+        """
+        Takes as input a key, key, then returns its value, marking it as the
+        most recently used entry.  Raises a KeyError if key is not cached.
+        """
+
+        # Check if key is not in the cache.
+        if key not in self.entries:
+            self.misses += 1  # Count the miss.
+            raise KeyError(key)
+
+        self.hits += 1  # Count the hit.
+        self.entries.move_to_end(key)  # Mark key as the most recently used.
+        return self.entries[key]  # Return the value of key.
+
+    def __setitem__(self, key, value):
+        """
+        Takes as input a key, key, and a value, value, then stores value for
+        key as the most recently used entry, evicting the least recently
+        used entries until the cache is within its bounds.
+        """
+
+        # Remove the old entry for key if there is one.
+        if key in self.entries:
+            self.bytes -= self._size(key, self.entries.pop(key))
+
+        # Add the new entry and its size.
+        self.entries[key] = value
+        self.bytes += self._size(key, value)
+
+        # Evict the least recently used entries while the cache is too big,
+        # but never evict the entry that was just added.
+        while len(self.entries) > 1 and (
+                (self.maxEntries is not None
+                 and len(self.entries) > self.maxEntries)
+                or (self.maxBytes is not None and self.bytes > self.maxBytes)):
+            self.bytes -= self._size(*self.entries.popitem(last=False))
+            self.evictions += 1  # Count the eviction.
+
+    def get(self, key, default=None):
+        """
+        Takes as input a key, key, and an optional value, default, then
+        returns the value of key if it is cached and default otherwise.
+        """
+
+        # Return the value of key, or the default on a miss.
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def clear(self):
+        """
+        Takes self as input, then removes all entries from the cache.
+        The counters of hits, misses, and evictions are kept.
+        """
+        self.entries.clear()  # Remove all entries.
+        self.bytes = 0  # Reset the estimated size.
+
+    def stats(self):
+        """
+        Takes self as input, then returns a dictionary of the number of
+        entries, the estimated size in bytes, and the numbers of hits,
+        misses, and evictions of the cache.
+        """
+        return {"entries": len(self.entries), "bytes": self.bytes,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+    @staticmethod
+    def _size(key, value):
+        """
+        Takes as input a key, key, and a value, value, then returns an
+        estimate of the number of bytes used by the entry, counting the
+        items of value if it is a tuple or a list.
+        """
+        size = sys.getsizeof(key) + sys.getsizeof(value)  # The entry itself.
+
+        # Add the size of the items of value if it is a sequence.
+        if isinstance(value, (tuple, list)):
+            size += sum(sys.getsizeof(item) for item in value)
+
+        return size  # Return the estimated size.
+
+
+def memoize(cache=None, bypass=None):
+    """
+    Takes as input an optional cache, cache, that supports get and item
+    assignment, e.g., an LRUCache, and an optional predicate, bypass, then
+    returns a decorator that memoizes a function of one argument in cache,
+    or in a new LRUCache if cache is None.  Arguments n with bypass(n) true
+    are calculated directly without touching the cache, e.g., when they are
+    cheaper to recalculate than to store.  The cache is kept as the cache
+    attribute of the decorated function, so it can be inspected, cleared,
+    or replaced.
+    """
+    def decorator(function):
+        """
+        Takes as input a function of one argument, function, then
+        returns the memoized version of function.
+        """
+
+        @wraps(function)
+        def memoized(n):
+            """
+            Takes as input n, then returns function(n), calculating and
+            caching it only if it is not in the cache already.
+            """
+
+            # Check if n should not be cached.
+            if bypass is not None and bypass(n):
+                return function(n)
+
+            # Check if the value has not been calculated already.
+            if (value := memoized.cache.get(n)) is None:
+                value = memoized.cache[n] = function(n)  # Calculate it.
+
+            return value  # Return the value.
+
+        # Set the cache of the memoized function.
+        memoized.cache = LRUCache() if cache is None else cache
+        return memoized  # Return the memoized function.
+
+    return decorator  # Return the decorator.
+
+
+# A bounded cache to memoize the prime factorizations
 # in the primeFactor function.
-factorizations = {}
+factorizations = LRUCache()
+
+# Numbers at least this large are factored with factorize, i.e., trial
+# division by small primes, Miller-Rabin, and Pollard-Brent rho, instead of
+# trial division by every odd number up to their square root.
+TRIAL_DIVISION_LIMIT = 1 << 32
+
+# The primes less than 1000, used to trial divide before Pollard's rho.
+SMALL_PRIMES = [p for p in range(2, 1000)
+                if all(p % q for q in range(2, isqrt(p) + 1))]
+
+# The Miller-Rabin witnesses that make the test deterministic for all
+# n < MILLER_RABIN_LIMIT = 3.317 * 10^24, which covers every 64-bit integer.
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MILLER_RABIN_LIMIT = 3317044064679887385961981
+
+# The number of extra random witnesses tried for n >= MILLER_RABIN_LIMIT,
+# where a composite passes every random witness with probability at most
+# 4^-MILLER_RABIN_ROUNDS, so the result is no longer guaranteed.
+MILLER_RABIN_ROUNDS = 20
+
+# A table of the smallest prime factor of every integer less than its
+# length, built by smallestPrimeFactorSieve.  Empty until a table is built.
+smallestPrimeFactors = array("I")
+
+
+def _inSmallestPrimeFactors(n):
+    """
+    Takes as input an integer, n, then returns True if n is covered by the
+    table of smallest prime factors, i.e., n can be factored in O(log n)
+    time, so functions of its factorization are not worth caching.
+    """
+    return n < len(smallestPrimeFactors)
+
+
+def smallestPrimeFactorSieve(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns an
+    array, spf, such that spf[k] is the smallest prime factor of k for
+    all 2 <= k < n, using the linear (Euler) sieve, which sets every entry
+    exactly once.  The table is also kept so primeFactor, phi, little_omega,
+    and big_omega can factor any number less than n in O(log n) time.
+    """
+    global smallestPrimeFactors  # The table used by primeFactor.
+    spf = array("I", bytes(4 * n))  # An array of n unsigned 32-bit zeros.
+    primes = []  # A list to store the primes found so far.
+
+    # Loop for all numbers from 2 to n - 1.
+    for i in range(2, n):
+
+        # If no prime has crossed off i, then i is prime.
+        if not spf[i]:
+            spf[i] = i  # The smallest prime factor of a prime is itself.
+            primes.append(i)  # Add i to the list of primes.
+
+        # Loop for all primes up to the smallest prime factor of i.  Each
+        # p * i has p as its smallest prime factor, so it is set only here.
+        for p in primes:
+
+            # Check if p is past the smallest prime factor of i or p * i
+            # is past the end of the table.
+            if p > spf[i] or p * i >= n:
+                break
+
+            spf[p * i] = p  # Set the smallest prime factor of p * i.
+
+    smallestPrimeFactors = spf  # Keep the table for primeFactor.
+    return spf  # Return the table of smallest prime factors.
 
 
 def primeFactor(n):
     """
     Takes as input n, then calculates and returns the prime factorization of n.
+    If n is covered by the table built by smallestPrimeFactorSieve, the
+    factorization is read from the table in O(log n) time.
     """
     factors = []  # A list to store the prime factorization.
+
+    # Check if n is covered by the table of smallest prime factors.
+    if n < len(smallestPrimeFactors):
+
+        # Divide out the smallest prime factor of n until n is 1.
+        while n > 1:
+            factors.append(p := smallestPrimeFactors[n])  # Add the factor.
+            n //= p  # Divide out the factor.
+
+        return factors  # Return the prime factorization of n.
+
+    # Check if n is too large to trial divide.
+    if n >= TRIAL_DIVISION_LIMIT:
+
+        # Check if n has been factored already, otherwise factor
+        # n with Pollard's rho and store the result.
+        if (cached := factorizations.get(n)) is None:
+            cached = factorizations[n] = tuple(factorize(n))
+        return list(cached)  # Return a copy of the factorization.
+
+    # Check if n has been factored already.
+    if (cached := factorizations.get(n)) is not None:
+        return list(cached)  # Return a copy of the factorization.
+
     tempn = n  # A variable to hold the original value of n.
 
     # Removes all factors of 2 from the input number, n.
@@ -32,7 +290,7 @@ def primeFactor(n):
         return factors  # Therefore, return the prime factorization.
 
     factor = 3  # Start at 3, the second prime number.
-    maxfactor = ceil(sqrt(n))  # Calculate the maximum factor.
+    maxfactor = isqrt(n)  # Calculate the maximum factor.
 
     # Loop until we reach the factor or n is not in factorizations.
     while factor <= maxfactor and n not in factorizations:
@@ -40,9 +298,9 @@ def primeFactor(n):
         # If the input number, n, is divisible by the variable
         # factor it means that we have found a new prime factor.
         if n % factor == 0:
-            n /= factor  # Divide out the prime factor.
+            n //= factor  # Divide out the prime factor.
             factors.append(factor)  # Append the current factor to factors.
-            maxfactor = ceil(sqrt(n))  # Recalculate the maximum factor.
+            maxfactor = isqrt(n)  # Recalculate the maximum factor.
         else:
             # Add 2 as we start on 3, an odd number, and 2 is the only
             # even prime number, so we can skip all even numbers.
@@ -51,15 +309,152 @@ def primeFactor(n):
 
     # Check if n is in factorizations, i.e, this was calculated already.
     if n in factorizations:
-        factors += factorizations[n]  # Append the dictionary value.
+        factors += factorizations[n]  # Append the cached value.
         return factors  # Return the factors.
 
-    factors.append(round(n))  # Append the largest prime factor to factors.
-    factorizations[tempn] = factors  # Set the value of n in to the dictionary.
+    factors.append(n)  # Append the largest prime factor to factors.
+
+    # Set the value of n in the cache.  Store a tuple so callers
+    # changing the returned list cannot change the cache.
+    factorizations[tempn] = tuple(factors)
 
     return factors  # Return the prime factorization of n.
 
 
+def isPrime(n):
+    """
+    Takes as input an integer, n, then returns True if n is prime and False
+    otherwise, using trial division by small primes and the Miller-Rabin
+    test.  The test is deterministic for all n < MILLER_RABIN_LIMIT.  For
+    larger n, MILLER_RABIN_ROUNDS random witnesses are also tried, so a
+    composite n is reported as prime with probability at most
+    4^-MILLER_RABIN_ROUNDS, but the result is not guaranteed.
+    """
+
+    # Check if n is less than 2 or divisible by a small prime.
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p  # n is prime only if it is the small prime.
+
+    # Write n - 1 = 2^s * d where d is odd.
+    s = ((n - 1) & (1 - n)).bit_length() - 1
+    d = (n - 1) >> s
+
+    # Add random witnesses if the fixed ones are not enough.
+    witnesses = MILLER_RABIN_BASES
+    if n >= MILLER_RABIN_LIMIT:
+        witnesses += tuple(randrange(2, n - 1)
+                           for _ in range(MILLER_RABIN_ROUNDS))
+
+    # Loop for every witness.
+    for a in witnesses:
+        x = pow(a, d, n)  # Calculate a^d mod n.
+
+        # Check if a is not a witness to n being composite.
+        if x == 1 or x == n - 1:
+            continue
+
+        # Square x up to s - 1 times looking for -1 mod n.
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False  # a is a witness that n is composite.
+
+    return True  # No witness was found, so n is prime.
+
+
+def pollardBrent(n):
+    """
+    Takes as input an odd composite integer, n, then returns a nontrivial
+    factor of n using Brent's variant of Pollard's rho algorithm, which
+    batches the gcd calculations by multiplying the differences mod n.
+    """
+
+    # Loop for every constant c in the polynomial f(y) = y^2 + c until a
+    # nontrivial factor is found.
+    for c in count(1):
+        y, r, q, g = 2, 1, 1, 1  # Initialize the search.
+        m = 128  # The number of differences to multiply before each gcd.
+
+        # Loop until a factor is found.
+        while g == 1:
+            x = y  # Remember the value at the start of this power of 2.
+
+            # Move y forward r steps.
+            for _ in range(r):
+                y = (y * y + c) % n
+
+            k = 0  # The number of steps taken past x.
+
+            # Loop in batches of m steps until a factor is found or 2r
+            # steps have been taken.
+            while k < r and g == 1:
+                ys = y  # Remember y in case the batch overshoots.
+
+                # Multiply the differences of the batch together mod n.
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+
+                g = gcd(q, n)  # Check the whole batch for a factor.
+                k += m  # Update the number of steps taken.
+
+            r <<= 1  # Double the length of the next cycle.
+
+        # Check if the batch overshot, then redo it one step at a time.
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+
+        # Check if the factor is nontrivial, otherwise try the next c.
+        if g != n:
+            return g
+
+
+def factorize(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns the
+    prime factorization of n in increasing order using trial division by
+    small primes, then the Miller-Rabin test and Pollard-Brent rho on
+    what remains.  All arithmetic is exact integer arithmetic.
+    """
+    factors = []  # A list to store the prime factorization.
+
+    # Divide out all small prime factors of n.
+    for p in SMALL_PRIMES:
+
+        # Check if all remaining factors are larger than p.
+        if p * p > n:
+            break
+
+        # Divide out p from n as many times as possible.
+        while n % p == 0:
+            n //= p  # Divide out the prime factor.
+            factors.append(p)  # Append the prime factor to factors.
+
+    composites = [n] if n > 1 else []  # Factors of n not yet known prime.
+
+    # Loop until every factor has been split into primes.
+    while composites:
+        m = composites.pop()  # Get a factor to split.
+
+        # Check if m is prime, otherwise split it in two.
+        if m < SMALL_PRIMES[-1] ** 2 or isPrime(m):
+            factors.append(m)  # m is prime, so append it to factors.
+        else:
+            f = pollardBrent(m)  # Find a nontrivial factor of m.
+            composites += [f, m // f]  # Split m into two factors.
+
+    return sorted(factors)  # Return the prime factorization of n.
+
+
+@memoize(bypass=_inSmallestPrimeFactors)
 def phi(n):
     """
     Takes as input a positive integer, n, then returns phi(n),
@@ -67,11 +462,17 @@ def phi(n):
     prime to n.  Phi is known as Euler's Totient Function.
     """
 
-    # Calculate phi(n) using a formula using n's prime factorization.
-    factors = [1 - (1 / factor) for factor in set(primeFactor(n))]
-    return round(n * reduce(mul, factors))
+    result = n  # Start with n.
 
+    # Calculate phi(n) = n * (1 - 1 / p) for every distinct prime p dividing
+    # n, one factor at a time, using exact integer arithmetic.
+    for p in set(primeFactor(n)):
+        result -= result // p  # Multiply by (1 - 1 / p).
 
+    return result  # Return phi(n).
+
+
+@memoize(bypass=_inSmallestPrimeFactors)
 def little_omega(n):
     """
     Takes as input a positive integer, n, then returns the number
@@ -83,6 +484,7 @@ def little_omega(n):
     return len(set(primeFactor(n)))
 
 
+@memoize(bypass=_inSmallestPrimeFactors)
 def big_omega(n):
     """
     Takes as input a positive integer, n, then returns the number
@@ -94,6 +496,7 @@ def big_omega(n):
     return len(primeFactor(n))
 
 
+@memoize()
 def d(n):
     """
     Takes as input n, then calculates and returns
@@ -111,6 +514,126 @@ def d(n):
     return s  # Return the sum of the all the divisors of n.
 
 
+def _primesBelow(n):
+    """
+    Takes as input a positive integer, n, then returns a NumPy array of
+    all primes less than n using an odd-only Sieve of Eratosthenes, where
+    index i represents 2i + 1 (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+
+    # Check if there are any primes less than n.
+    if n <= 2:
+        return np.empty(0, dtype=np.int64)  # Return no primes.
+
+    prime = np.ones(n >> 1, dtype=bool)  # Create an odd-only sieve.
+
+    # Cross off the odd multiples of every odd prime p = 2i + 1 with
+    # p * p < n, starting at p * p, which is at index 2i(i + 1).
+    for i in range(1, (isqrt(n - 1) + 1) >> 1):
+        if prime[i]:
+            prime[2 * i * (i + 1)::2 * i + 1] = False
+
+    primes = 2 * np.flatnonzero(prime) + 1  # Convert indices to numbers.
+    primes[0] = 2  # Replace 1, at index 0, with 2.
+    return primes  # Return the primes less than n.
+
+
+def phiRange(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns a
+    NumPy array, a, such that a[k] = phi(k) for all 1 <= k < n, and
+    a[0] = 0.  Every prime p multiplies all of its multiples by (1 - 1 / p)
+    with exact integer arithmetic in one vectorized step (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+    result = np.arange(n, dtype=np.int64)  # Start with a[k] = k.
+
+    # Loop for all primes p less than n.
+    for p in _primesBelow(n).tolist():
+        multiples = result[p::p]  # A view of the multiples of p.
+        multiples -= multiples // p  # Multiply them by (1 - 1 / p).
+
+    return result  # Return the values of phi.
+
+
+def omegaRange(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns a
+    NumPy array, a, such that a[k] = little_omega(k) for all 1 <= k < n,
+    and a[0] = 0, by adding 1 to every multiple of every prime p in one
+    vectorized step per prime (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+    result = np.zeros(n, dtype=np.int64)  # Start with a[k] = 0.
+
+    # Loop for all primes p less than n.
+    for p in _primesBelow(n).tolist():
+        result[p::p] += 1  # Count p as a prime factor of its multiples.
+
+    return result  # Return the values of little omega.
+
+
+def bigOmegaRange(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns a
+    NumPy array, a, such that a[k] = big_omega(k) for all 1 <= k < n, and
+    a[0] = 0, by adding 1 to every multiple of every prime power p^i in one
+    vectorized step per prime power (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+    result = np.zeros(n, dtype=np.int64)  # Start with a[k] = 0.
+
+    # Loop for all primes p less than n.
+    for p in _primesBelow(n).tolist():
+        power = p  # Start at p^1.
+
+        # Loop for all powers of p less than n.
+        while power < n:
+            result[power::power] += 1  # Count one more factor of p.
+            power *= p  # Move to the next power of p.
+
+    return result  # Return the values of big omega.
+
+
+def divisorSumRange(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns a
+    NumPy array, a, such that a[k] = d(k), the sum of all proper divisors
+    of k, for all 2 <= k < n, and a[0] = a[1] = 0.  The sum of all
+    divisors, sigma, is built multiplicatively: for every prime p, each
+    multiple k of p is multiplied by 1 + p + ... + p^e, where p^e is the
+    largest power of p dividing k (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+    sigma = np.ones(n, dtype=np.int64)  # Start with sigma(k) = 1.
+
+    # Loop for all primes p less than n.
+    for p in _primesBelow(n).tolist():
+
+        # Check if p^2 >= n, so p divides each of its multiples once.
+        if p * p >= n:
+            sigma[p::p] *= 1 + p  # Multiply by 1 + p.
+            continue
+
+        # Build 1 + p + ... + p^e for every multiple of p, where entry j
+        # represents (j + 1)p, so it is a multiple of p^i if j + 1 is a
+        # multiple of p^(i - 1).
+        factor = np.full((n - 1) // p, 1 + p, dtype=np.int64)
+        power = p * p  # Start at p^2.
+
+        # Loop for all powers of p less than n.
+        while power < n:
+            factor[power // p - 1::power // p] += power  # Add p^i.
+            power *= p  # Move to the next power of p.
+
+        sigma[p::p] *= factor  # Multiply the multiples of p by the factor.
+
+    sigma -= np.arange(n, dtype=np.int64)  # Remove k itself from sigma(k).
+    sigma[:2] = 0  # 0 and 1 have no proper divisors.
+    return sigma  # Return the sums of the proper divisors.
+
+
 if __name__ == "__main__":
 
     print(primeFactor(100))  # Get the prime factoriation of 100.
@@ -118,5 +641,14 @@ if __name__ == "__main__":
     print(little_omega(100))  # The number of distinct prime factors of 100.
     print(big_omega(100))  # The number of non-distinct prime factors of 100.
 
+    print(primeFactor(2 ** 64 - 1))  # Factor 2^64 - 1 with Pollard's rho.
+
+    smallestPrimeFactorSieve(10 ** 6)  # Build a smallest prime factor table.
+    print(primeFactor(999999))  # Factor 999999 using the table.
+
+    print(factorizations.stats())  # The statistics of the cache.
+
+    print(phiRange(10))  # The values of phi(k) for all k < 10.
+
     # Convert this file to a .ipynb and show formulas for number
     # theoretic functions.
@@ -4,14 +4,52 @@ Date: 9/18/2021
 Description: A file containing different sieves to find prime numbers.
 """
 
+import mmap
+import os
+import struct
 import timeit
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, compress
+from math import ceil, isqrt
 
 
-def sieveOfEratosthenes(n):
+# The odd primes up to the square root of the end of the range being
+# sieved by a worker process of parallelSieve.  Set once per worker.
+_workerBasePrimes = []
+
+# The layout of the header of an on-disk prime table: a magic string,
+# the number n such that the table holds all primes less than n, and the
+# number of bytes of the bitmap in each block of the rank index.
+PRIME_TABLE_MAGIC = b"PRIMETBL"
+PRIME_TABLE_HEADER = struct.Struct("<8sQQ")
+
+# The number of bytes of the bitmap of an on-disk prime table covered by
+# a single entry of its rank index, i.e., 8192 consecutive integers.
+PRIME_TABLE_BLOCK_BYTES = 512
+
+# A translation table that turns a segment of 0 and 1 bytes into a
+# string of "0" and "1" characters, so it can be packed into bits.
+_BITS = bytes.maketrans(b"\x00\x01", b"01")
+
+# The number of odd numbers held in a single segment of the segmented
+# Sieve of Eratosthenes.  One byte per odd number keeps the working
+# window at 256 KiB, i.e., small enough to stay in the L2 cache.
+SEGMENT_SIZE = 1 << 18
+
+
+def sieveOfEratosthenes(n, backend="python", asArray=False):
     """
     Takes as input a positive integer, n, then calculates and returns
-    all primes less than n using the Sieve of Eratosthenes.
+    all primes less than n using the Sieve of Eratosthenes.  If backend
+    is "numpy", the sieve is done with NumPy and, if asArray is True,
+    the primes are returned as a NumPy array instead of a list.
     """
+
+    # Check if the NumPy backend should be used.
+    if backend != "python":
+        return _numpyBackend(_numpySieveOfEratosthenes, n, backend, asArray)
+
     prime = [1] * n  # Create a list for the Sieve of Eratosthenes.
     prime[0] = prime[1] = 0  # Set the first two numbers to not prime.
     p = 2  # Start the counter at 2 as 1 would cross off all numbers.
@@ -23,7 +61,7 @@ def sieveOfEratosthenes(n):
         if prime[p]:
 
             # Remove all multiples of p from being prime.
-            for i in range(p * 2, n, p):
+            for i in range(p * p, n, p):
                 prime[i] = 0  # Set the value to false since it is not prime.
 
         p += 1  # Increment p by 1.
@@ -31,11 +69,454 @@ def sieveOfEratosthenes(n):
     return [p for p in range(n) if prime[p]]  # Return the primes less than n.
 
 
-def sieveOfSundaram(n):
+def _basePrimes(limit):
+    """
+    Takes as input a non-negative integer, limit, then calculates and
+    returns all odd primes less than or equal to limit using an odd-only
+    Sieve of Eratosthenes.  Index i of the sieve represents 2i + 1.
+    """
+    size = (limit + 1) >> 1  # The number of odd numbers up to limit.
+    prime = bytearray([1]) * size  # Create an odd-only sieve.
+
+    # Check if there are any odd numbers, then set 1 to not prime.
+    if size:
+        prime[0] = 0
+
+    # Loop for all odd p such that p * p <= limit.
+    for i in range(1, (isqrt(limit) + 1) >> 1):
+
+        # Check if p = 2i + 1 is prime.
+        if prime[i]:
+            p = 2 * i + 1  # Calculate the prime represented by i.
+            start = (p * p) >> 1  # The index of p * p, the first multiple.
+
+            # Cross off every odd multiple of p in one slice assignment.
+            prime[start::p] = bytes(len(range(start, size, p)))
+
+    # Return the odd primes less than or equal to limit.
+    return list(compress(range(1, 2 * size, 2), prime))
+
+
+def _segments(lo, hi=None, segmentSize=SEGMENT_SIZE, basePrimes=None):
+    """
+    Takes as input a non-negative integer, lo, a non-negative integer or
+    None, hi, and a positive integer, segmentSize, then generates the Sieve
+    of Eratosthenes over the odd numbers in [max(lo, 3), hi) one segment at
+    a time, forever if hi is None.  Each segment is yielded as a 2-tuple,
+    (start, segment), where start is odd and segment[i] is 1 if start + 2i
+    is prime and 0 otherwise.  At most segmentSize bytes of the sieve and
+    the primes up to the square root of the current segment's end are held
+    in memory at any time.  A sorted list of the odd primes up to at least
+    sqrt(hi), basePrimes, can be passed in to avoid recalculating them.
+    """
+    start = max(lo, 3) | 1  # The first odd number of the first segment.
+    limit = 0  # The number up to which the sieving primes have been found.
+
+    # A list of the odd sieving primes found so far and a list holding, for
+    # every sieving prime, the index in the current segment of the next odd
+    # multiple of the prime to cross off.
+    sievingPrimes, offsets = [], []
+
+    # Loop for every segment in the sieve.
+    while hi is None or start < hi:
+        end = start + 2 * segmentSize  # The end of the segment.
+        end = end if hi is None else min(end, hi)
+
+        # Check if more sieving primes are needed to sieve this segment.
+        if (root := isqrt(end - 1)) > limit:
+
+            # Find all sieving primes needed for a bounded sieve at once, or
+            # at least double the limit for an unbounded sieve so the
+            # sieving primes are only recalculated a logarithmic number of
+            # times.  Use the base primes passed in if there are any.
+            limit = isqrt(hi - 1) if hi is not None else max(root, 2 * limit)
+            newPrimes = (basePrimes[:bisect_right(basePrimes, limit)]
+                         if basePrimes is not None and hi is not None
+                         else _basePrimes(limit))[len(sievingPrimes):]
+
+            # Loop for all new sieving primes to calculate their offsets.
+            for p in newPrimes:
+
+                # Calculate the first odd multiple of p that is both
+                # at least p * p and at least the start of the segment.
+                first = max(p * p, (start + p - 1) // p * p)
+                first += p if not first & 1 else 0
+                offsets.append((first - start) >> 1)
+
+            sievingPrimes += newPrimes  # Add the new sieving primes.
+
+        size = (end - start + 1) >> 1  # The number of odd numbers in it.
+        segment = bytearray([1]) * size  # The working window of the sieve.
+
+        # Loop for all sieving primes and their offsets.
+        for j, p in enumerate(sievingPrimes):
+            i = offsets[j]  # The index of the next multiple to cross off.
+
+            # Check if p has a multiple in this segment.
+            if i < size:
+
+                # Cross off all multiples of p in one slice assignment.
+                count = (size - 1 - i) // p + 1
+                segment[i::p] = bytes(count)
+                i += count * p  # Move past the last multiple crossed off.
+
+            offsets[j] = i - size  # Shift the offset to the next segment.
+
+        yield start, segment  # Yield the sieved segment.
+        start = end  # Move to the start of the next segment.
+
+
+def primes(start=2, stop=None):
+    """
+    Takes as input a non-negative integer, start, and a non-negative
+    integer or None, stop, then lazily generates all primes p such that
+    start <= p < stop in increasing order, or all primes p >= start if
+    stop is None.  Segments of the sieve are only calculated as they are
+    needed, so the generator can be stopped early at no extra cost and
+    uses O(sqrt(stop)) memory.
+    """
+
+    # Deal with the only even prime first.
+    if start <= 2 and (stop is None or stop > 2):
+        yield 2
+
+    # Loop for every segment and yield the primes in it.
+    for first, segment in _segments(start, stop):
+        yield from compress(range(first, first + 2 * len(segment), 2),
+                            segment)
+
+
+def segmentedSieveOfEratosthenes(n, segmentSize=SEGMENT_SIZE):
     """
     Takes as input a positive integer, n, then calculates and returns
-    all primes less than n using the Sieve of Sundaram.
+    all primes less than n using a segmented, odd-only Sieve of
+    Eratosthenes.  Gives the same result as sieveOfEratosthenes, but
+    only segmentSize bytes of the sieve are in memory at any time.
     """
+    primes = [2] if n > 2 else []  # Deal with the only even prime first.
+
+    # Loop for every segment and add the primes in it to primes.
+    for start, segment in _segments(3, n, segmentSize):
+        primes.extend(compress(range(start, start + 2 * len(segment), 2),
+                               segment))
+
+    return primes  # Return the primes less than n.
+
+
+def countPrimes(n, segmentSize=SEGMENT_SIZE):
+    """
+    Takes as input a positive integer, n, then calculates and returns the
+    number of primes less than n using the segmented Sieve of Eratosthenes.
+    Memory is bounded by segmentSize bytes plus the primes up to sqrt(n).
+    """
+
+    # Count the primes in every segment and add 1 for 2 if n > 2.
+    return (n > 2) + sum(segment.count(1) for _, segment
+                         in _segments(3, n, segmentSize))
+
+
+def _initializeWorker(basePrimes):
+    """
+    Takes as input a list of odd primes, basePrimes, then stores them in
+    the worker process so they are shared by all segments it sieves.
+    """
+    global _workerBasePrimes  # Set the base primes of this worker process.
+    _workerBasePrimes = basePrimes
+
+
+def _sieveRange(task):
+    """
+    Takes as input a 3-tuple, task, of two non-negative integers, lo and
+    hi, and a boolean, aggregate, then sieves [lo, hi) with the base primes
+    of the worker process.  Returns the odd primes in [lo, hi) as a list,
+    or their count and sum as a 2-tuple if aggregate is True.
+    """
+    lo, hi, aggregate = task  # Unpack the task.
+    count = total = 0  # Variables to store the count and sum of the primes.
+    primes = []  # A list to store the primes.
+
+    # Loop for every segment in the range.
+    for start, segment in _segments(lo, hi, basePrimes=_workerBasePrimes):
+
+        # Get the primes in the segment.
+        segmentPrimes = compress(range(start, start + 2 * len(segment), 2),
+                                 segment)
+
+        # Check if only the count and sum of the primes are needed.
+        if aggregate:
+            count += segment.count(1)  # Add the count of the primes.
+            total += sum(segmentPrimes)  # Add the sum of the primes.
+        else:
+            primes.extend(segmentPrimes)  # Add the primes to the list.
+
+    return (count, total) if aggregate else primes  # Return the result.
+
+
+def parallelSieve(lo, hi, workers=None, aggregate=False):
+    """
+    Takes as input two non-negative integers, lo and hi, and an optional
+    positive integer, workers, then calculates and returns all primes in
+    [lo, hi) in increasing order using the segmented Sieve of Eratosthenes
+    split into disjoint ranges across workers processes (by default, one
+    per CPU).  The base primes up to sqrt(hi) are calculated once and sent
+    to each worker once.  If aggregate is True, only the count and the sum
+    of the primes are returned as a 2-tuple.
+    """
+    workers = workers or os.cpu_count() or 1  # Get the number of workers.
+    evenPrimes = [2] if lo <= 2 < hi else []  # Deal with 2 first.
+    start = max(lo, 3)  # The start of the odd part of the range.
+
+    # Split the odd part of the range into several tasks per worker so
+    # workers that finish early can take the remaining tasks, but make each
+    # task at least one full segment.  Keep every task boundary even.
+    span = max(ceil((hi - start) / (8 * workers)), 2 * SEGMENT_SIZE)
+    span += span & 1
+    tasks = [(s, min(s + span, hi), aggregate)
+             for s in range(start, hi, span)]
+
+    # Calculate the base primes once and share them with every worker, then
+    # sieve the tasks.  map returns the results in order of the tasks.
+    with ProcessPoolExecutor(workers, initializer=_initializeWorker,
+                             initargs=(_basePrimes(isqrt(max(hi - 1, 0))),)
+                             ) as executor:
+        results = list(executor.map(_sieveRange, tasks))
+
+    # Check if only the count and sum of the primes are needed.
+    if aggregate:
+
+        # Return the count and sum of the primes in [lo, hi).
+        return (sum(c for c, _ in results) + len(evenPrimes),
+                sum(t for _, t in results) + sum(evenPrimes))
+
+    # Merge the primes from every task in order.
+    return evenPrimes + [p for primes in results for p in primes]
+
+
+def _packBits(sieve):
+    """
+    Takes as input a bytearray of 0 and 1 bytes, sieve, whose length is a
+    multiple of 8, then packs it into a bytes object with one bit per
+    byte of sieve, where bit j of byte i is sieve[8i + j].
+    """
+
+    # Reverse the sieve so sieve[0] becomes the least significant bit,
+    # then read it as a binary number and write it out in little endian.
+    bits = sieve[::-1].translate(_BITS) or b"0"
+    return int(bits, 2).to_bytes(len(sieve) >> 3, "little")
+
+
+def writePrimeTable(path, n):
+    """
+    Takes as input a file path, path, and a positive integer, n, then
+    writes all primes less than n to path as a bitmap over the odd
+    numbers, where bit i is set if 2i + 1 is prime, preceded by a header
+    and a rank index holding the number of odd primes before every block
+    of PRIME_TABLE_BLOCK_BYTES bytes of the bitmap.  The bitmap is written
+    a segment at a time, so memory is bounded by the segmented sieve.
+    """
+    bitmapBytes = ((n >> 1) + 7) >> 3  # The length of the bitmap.
+    blocks = -(-bitmapBytes // PRIME_TABLE_BLOCK_BYTES)  # Number of blocks.
+    index = [0] * (blocks + 1)  # The rank index, plus the total count.
+    pending = bytearray([0])  # Sieved odd numbers not yet packed, i.e., 1.
+    written = count = 0  # The bytes of the bitmap written and primes seen.
+
+    with open(path, "wb") as file:
+
+        # Write the header, then skip the rank index for now.
+        file.write(PRIME_TABLE_HEADER.pack(PRIME_TABLE_MAGIC, n,
+                                           PRIME_TABLE_BLOCK_BYTES))
+        file.seek(8 * len(index), os.SEEK_CUR)
+
+        # Loop for every segment, plus a final padding segment of zeros.
+        for _, segment in chain(_segments(3, n), [(0, bytearray(7))]):
+            pending += segment  # Add the segment to the pending numbers.
+            packed = _packBits(pending[:len(pending) & ~7])  # Pack bytes.
+            del pending[:len(pending) & ~7]  # Remove the packed numbers.
+            packed = packed[:bitmapBytes - written]  # Drop the padding.
+
+            # Loop for every block starting in the packed bytes and
+            # record the number of odd primes before the block.
+            for b in range(-(-written // PRIME_TABLE_BLOCK_BYTES),
+                           -(-(written + len(packed))
+                             // PRIME_TABLE_BLOCK_BYTES)):
+                offset = b * PRIME_TABLE_BLOCK_BYTES - written
+                index[b] = count + int.from_bytes(packed[:offset],
+                                                  "little").bit_count()
+
+            file.write(packed)  # Write the packed bytes to the bitmap.
+            written += len(packed)  # Update the number of bytes written.
+            count += int.from_bytes(packed, "little").bit_count()
+
+        # Write the total number of odd primes, then go back and write the
+        # rank index between the header and the bitmap.
+        index[blocks] = count
+        file.seek(PRIME_TABLE_HEADER.size)
+        file.write(struct.pack(f"<{len(index)}Q", *index))
+
+
+class PrimeTable:
+    """
+    A class to represent a table of all primes less than some n that was
+    written to disk by writePrimeTable.  The file is opened with mmap, so
+    opening it is instant, nothing is copied into memory, and the pages
+    are shared by every process that opens the same file.
+    """
+
+    def __init__(self, path):
+        """
+        The constructor for the PrimeTable class.  Takes as input a file
+        path, path, then memory maps the prime table stored at path.
+        Raises a ValueError if path does not hold a prime table.
+        """
+
+        # Memory map the file read only.
+        with open(path, "rb") as file:
+            self.mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Read and check the header.
+        magic, self.n, self.blockBytes = PRIME_TABLE_HEADER.unpack_from(
+            self.mm)
+        if magic != PRIME_TABLE_MAGIC:
+            self.mm.close()  # Close the memory map before raising.
+            raise ValueError(f"{path} is not a prime table.")
+
+        # Calculate the number of blocks in the rank index
+        # and the offset of the bitmap in the file.
+        bitmapBytes = ((self.n >> 1) + 7) >> 3
+        self.blocks = -(-bitmapBytes // self.blockBytes)
+        self.bitmap = PRIME_TABLE_HEADER.size + 8 * (self.blocks + 1)
+
+    def __enter__(self):
+        """
+        Returns self so a PrimeTable can be used in a with statement.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """
+        Closes the memory map at the end of a with statement.
+        """
+        self.close()
+
+    def __len__(self):
+        """
+        Takes self as input, then returns the number of primes in the table.
+        """
+        return self._rank(self.blocks) + (self.n > 2)
+
+    def close(self):
+        """
+        Takes self as input, then closes the memory map of the prime table.
+        """
+        self.mm.close()
+
+    def _rank(self, block):
+        """
+        Takes as input the number of a block of the bitmap, block, then
+        returns the number of odd primes before it from the rank index.
+        """
+        return struct.unpack_from("<Q", self.mm,
+                                  PRIME_TABLE_HEADER.size + 8 * block)[0]
+
+    def _check(self, k):
+        """
+        Takes as input an integer, k, then raises a ValueError if k is
+        not covered by the prime table.
+        """
+        if not 0 <= k < self.n:
+            raise ValueError(f"{k} is outside of the prime table "
+                             f"[0, {self.n}).")
+
+    def isPrime(self, k):
+        """
+        Takes as input a non-negative integer, k, less than n, then
+        returns True if k is prime and False otherwise.
+        """
+        self._check(k)  # Make sure k is in the prime table.
+
+        # Check if k is even, then return if it is 2.  Otherwise,
+        # return bit (k - 1) / 2 of the bitmap.
+        if not k & 1:
+            return k == 2
+        i = k >> 1  # The bit of k in the bitmap.
+        return bool(self.mm[self.bitmap + (i >> 3)] >> (i & 7) & 1)
+
+    def primePi(self, x):
+        """
+        Takes as input a non-negative integer, x, less than n, then
+        returns the number of primes less than or equal to x.
+        """
+        self._check(x)  # Make sure x is in the prime table.
+        bits = (x + 1) >> 1  # The number of odd numbers <= x.
+        full = bits >> 3  # The number of whole bytes covering them.
+        block = full // self.blockBytes  # The block the last byte is in.
+        start = self.bitmap + block * self.blockBytes  # Start of the block.
+
+        # Add up the odd primes before the block, in the whole bytes of the
+        # block, and in the last partial byte, then add 1 for 2 if x >= 2.
+        count = self._rank(block) + int.from_bytes(
+            self.mm[start:self.bitmap + full], "little").bit_count()
+        if bits & 7:
+            count += (self.mm[self.bitmap + full]
+                      & ((1 << (bits & 7)) - 1)).bit_count()
+        return count + (x >= 2)
+
+    def nthPrime(self, i):
+        """
+        Takes as input a positive integer, i, then returns the ith prime,
+        e.g., nthPrime(1) = 2.  Raises a ValueError if the ith prime is
+        not in the prime table.
+        """
+
+        # Make sure the ith prime is in the prime table.
+        if not 1 <= i <= len(self):
+            raise ValueError(f"The prime table has no prime number {i}.")
+
+        # Check if the 1st prime, 2, was requested.
+        if i == 1:
+            return 2
+
+        lo, hi = 0, self.blocks  # Bounds for a binary search of the index.
+
+        # Binary search for the last block with fewer than i - 1 odd
+        # primes before it, i.e., the block holding the (i - 1)th odd prime.
+        while hi - lo > 1:
+            mid = (lo + hi) >> 1  # Get the middle block.
+            lo, hi = (mid, hi) if self._rank(mid) < i - 1 else (lo, mid)
+
+        remaining = i - 1 - self._rank(lo)  # The odd primes left to skip.
+        position = self.bitmap + lo * self.blockBytes  # The current byte.
+
+        # Loop through the bytes of the block until the
+        # byte holding the (i - 1)th odd prime is reached.
+        while (c := self.mm[position].bit_count()) < remaining:
+            remaining -= c  # Skip the odd primes in the byte.
+            position += 1  # Move to the next byte.
+
+        byte = self.mm[position]  # The byte holding the prime.
+
+        # Remove the lowest set bits of the byte until the
+        # bit of the (i - 1)th odd prime is the lowest.
+        for _ in range(remaining - 1):
+            byte &= byte - 1
+
+        # Return the odd number represented by the lowest set bit.
+        bit = ((position - self.bitmap) << 3) + (byte & -byte).bit_length() - 1
+        return 2 * bit + 1
+
+
+def sieveOfSundaram(n, backend="python", asArray=False):
+    """
+    Takes as input a positive integer, n, then calculates and returns
+    all primes less than n using the Sieve of Sundaram.  If backend
+    is "numpy", the sieve is done with NumPy and, if asArray is True,
+    the primes are returned as a NumPy array instead of a list.
+    """
+
+    # Check if the NumPy backend should be used.
+    if backend != "python":
+        return _numpyBackend(_numpySieveOfSundaram, n, backend, asArray)
+
     k = ((n - 2) >> 1) + 1  # Set the value k to the floor(n - 2) + 1.
     prime = [1] * k  # Set a list for the possible prime numbers.
 
@@ -54,6 +535,87 @@ def sieveOfSundaram(n):
     return evenPrimes + oddPrimes  # Return the primes less than n.
 
 
+def _numpyBackend(sieve, n, backend, asArray):
+    """
+    Takes as input a NumPy sieve function, sieve, a positive integer, n,
+    the name of a backend, backend, and a boolean, asArray, then runs the
+    sieve on n and returns the primes as a NumPy array if asArray is True
+    and as a list otherwise.  Raises a ValueError for unknown backends.
+    """
+
+    # Make sure a valid backend was entered.
+    if backend != "numpy":
+        raise ValueError(f"Unknown backend: {backend!r}.")
+
+    primes = sieve(n)  # Run the sieve.
+    return primes if asArray else primes.tolist()  # Return the primes.
+
+
+def _numpySieveOfEratosthenes(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns a
+    NumPy array of all primes less than n using an odd-only Sieve of
+    Eratosthenes.  Index i of the sieve represents 2i + 1 and multiples
+    are crossed off with strided slice assignment (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when this backend is used.
+
+    # Check if there are any primes less than n.
+    if n <= 2:
+        return np.empty(0, dtype=np.int64)  # Return no primes.
+
+    prime = np.ones(n >> 1, dtype=bool)  # Create an odd-only sieve.
+
+    # Loop for all odd p = 2i + 1 such that p * p < n.
+    for i in range(1, (isqrt(n - 1) + 1) >> 1):
+
+        # Check if p is prime, then cross off all odd multiples of p
+        # starting at p * p, which is at index 2i(i + 1).
+        if prime[i]:
+            prime[2 * i * (i + 1)::2 * i + 1] = False
+
+    # Convert the indices of the odd primes to the primes in place.  Index
+    # 0, i.e., 1, is left marked so it can be replaced by 2 without a copy.
+    primes = np.flatnonzero(prime)
+    primes <<= 1
+    primes += 1
+    primes[0] = 2
+
+    return primes  # Return the primes less than n.
+
+
+def _numpySieveOfSundaram(n):
+    """
+    Takes as input a positive integer, n, then calculates and returns
+    a NumPy array of all primes less than n using the Sieve of Sundaram.
+    For every i, all i + j + 2ij with j >= i are crossed off at once with
+    strided slice assignment, as they step by 2i + 1 (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when this backend is used.
+
+    # Check if there are any primes less than n.
+    if n <= 2:
+        return np.empty(0, dtype=np.int64)  # Return no primes.
+
+    k = ((n - 2) >> 1) + 1  # Set the value k to the floor(n - 2) + 1.
+    prime = np.ones(k, dtype=bool)  # Set an array for the possible primes.
+    i = 1  # Start i at 1.
+
+    # Loop until i + i + 2ii >= k.
+    while (v := (i * (i + 1)) << 1) < k:
+        prime[v::2 * i + 1] = False  # Cross off i + j + 2ij for all j >= i.
+        i += 1  # Increment i.
+
+    # Convert the indices p to the odd primes 2p + 1 in place.  Index 0,
+    # i.e., 1, is left marked so it can be replaced by 2 without a copy.
+    primes = np.flatnonzero(prime)
+    primes <<= 1
+    primes += 1
+    primes[0] = 2
+
+    return primes  # Return the primes less than n.
+
+
 def wrapper(func, *args, **kwargs):
     """
     Define a wrapper to pass functions to the timeit function
@@ -71,10 +633,19 @@ if __name__ == "__main__":
 
     # print(sieveOfEratosthenes(100)) # Find all primes less then 100.
     # print(sieveOfSundaram(100)) # Find all primes less then 100.
+    # print(list(primes(100, 200))) # Find all primes in [100, 200).
+    # print(parallelSieve(0, 10 ** 9, aggregate=True)) # pi(10^9) and sum.
+    # writePrimeTable("primes.bin", 10 ** 6) # Write a prime table to disk.
+    # print(PrimeTable("primes.bin").nthPrime(1000)) # The 1000th prime.
 
     # Run and time the recursive and matrix definitions.
     print(timeit.timeit(wrapper(sieveOfEratosthenes, 1000), number=10))
     print(timeit.timeit(wrapper(sieveOfSundaram, 1000), number=10))
+    print(timeit.timeit(wrapper(segmentedSieveOfEratosthenes, 1000),
+                        number=10))
+    print(timeit.timeit(wrapper(sieveOfEratosthenes, 1000, "numpy"),
+                        number=10))
+    print(timeit.timeit(wrapper(sieveOfSundaram, 1000, "numpy"), number=10))
 
     # My implementations of the Sieve of Eratosthenes runs faster
     # 2x faster than my implementation of the Sieve of Sundaram.
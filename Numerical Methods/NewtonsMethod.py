@@ -1,71 +1,638 @@
 """
 Author: Ryan Adoni
 Date: 9/22/2021
-Description: Newton's Method for interpolation.
+Description: Newton's Method for interpolation, along with barycentric and
+Chebyshev interpolation, and the Newton-Raphson method for root finding.
+NumPy is only imported to evaluate arrays of points, to fit Chebyshev
+coefficients, and to solve batches of equations.
 """
+from math import cos, frexp, isfinite, pi
+from numbers import Number
 
 
-def NewtonInterpolation(L, x):
+# The largest number of query point and node pairs that
+# BarycentricInterpolator evaluates at once for an array of points.
+BARYCENTRIC_BLOCK_SIZE = 1 << 20
+
+# The default tolerance and iteration limit of the Newton-Raphson method.
+NEWTON_TOLERANCE = 1e-12
+NEWTON_MAX_ITERATIONS = 100
+
+# The relative step of the central difference used when no derivative is
+# given, about the cube root of the float epsilon to balance the truncation
+# and rounding errors.
+FINITE_DIFFERENCE_STEP = 6e-6
+
+
+class NewtonInterpolator:
     """
-    Takes as input a list of 2-tuples, i.e., points, L, then
-    interpolates and returns f(x), where f is the unique
-    len(L) - 1 degree polynomial containing all points in L.
-    Uses Newton Interpolation with Divided Differences.
+    A class to represent the unique polynomial through a list of points in
+    Newton's form, f(x) = c0 + c1(x - x0) + c2(x - x0)(x - x1) + ....  The
+    coefficients are calculated once, so the polynomial can be evaluated at
+    many points in O(n) time each, and points can be appended one at a time
+    in O(n) time each.  Exact inputs, e.g., Fractions, stay exact, and
+    nothing is rounded.
+    """
+
+    def __init__(self, L=()):
+        """
+        The constructor for the NewtonInterpolator class.  Takes as input a
+        list of 2-tuples, i.e., points, L, with distinct x coordinates, then
+        appends them one at a time, which takes O(len(L)^2) time in total
+        and O(len(L)) memory.
+        """
+        self.xs, self.coefficients = [], []  # The x's and Newton coefficients.
+
+        # The last diagonal of the divided difference table, i.e.,
+        # diagonal[j] is the divided difference of the last j + 1 points.
+        self.diagonal = []
+
+        # Loop to add every point in L.
+        for point in L:
+            self.append(point)
+
+    def __len__(self):
+        """
+        Returns the number of points in the interpolator.
+        """
+        return len(self.xs)
+
+    def append(self, point):
+        """
+        Takes as input a 2-tuple, i.e., a point, whose x coordinate differs
+        from every point already added, then raises the degree of the
+        polynomial by one so it also contains the point.  Only the last
+        diagonal of the divided difference table is kept, so this takes
+        O(n) time and memory instead of rebuilding the whole table.
+        """
+        x, y = point  # Get the coordinates of the new point.
+        n = len(self.xs)  # Get the number of points before the new one.
+        diagonal = [y]  # The new diagonal starts from f[x] = y.
+
+        # Loop to calculate the divided difference of the last j + 1 points
+        # from the one of the last j points and the old diagonal.
+        for j in range(1, n + 1):
+            numerator = diagonal[j - 1] - self.diagonal[j - 1]
+            denominator = x - self.xs[n - j]
+            diagonal.append(numerator / denominator)
+
+        # The divided difference of all points is the new coefficient.
+        self.xs.append(x)
+        self.coefficients.append(diagonal[-1])
+        self.diagonal = diagonal
+
+    def __call__(self, x):
+        """
+        Takes as input a number or a NumPy array, x, then evaluates and
+        returns f(x) using nested multiplication (Horner's method), i.e.,
+        c0 + (x - x0)(c1 + (x - x1)(c2 + ...)).  An array is evaluated at
+        every point at once.
+        """
+
+        # Check if there are no points, i.e., f is the zero polynomial.
+        if not self.coefficients:
+            return 0 * x
+
+        fx = self.coefficients[-1] + 0 * x  # Start from the last coefficient.
+
+        # Loop from the second last coefficient to the first.
+        for c, xi in zip(reversed(self.coefficients[:-1]),
+                         reversed(self.xs[:-1])):
+            fx = fx * (x - xi) + c  # Nest one more multiplication.
+
+        return fx  # Return f(x).
+
+
+class BarycentricInterpolator:
+    """
+    A class to represent the unique polynomial through a list of points in
+    barycentric Lagrange form, f(x) = sum(wj*yj/(x - xj)) / sum(wj/(x - xj)),
+    where wj = 1 / prod(xj - xk) over k != j.  Any common factor of the
+    weights cancels out of f, and float weights are kept as a mantissa and
+    a power of 2 so they neither overflow nor underflow at high degree.
+    Appending a point and evaluating f(x) both take O(n) time, and the form
+    is stable even at high degree when the x's cluster like Chebyshev nodes.
+    """
+
+    def __init__(self, L=()):
+        """
+        The constructor for the BarycentricInterpolator class.  Takes as
+        input a list of 2-tuples, i.e., points, L, with distinct x
+        coordinates, then appends them one at a time.
+        """
+        self.xs, self.ys = [], []  # The points.
+
+        # The weights, where wj is weights[j] * 2^exponents[j].
+        self.weights, self.exponents = [], []
+
+        # Loop to add every point in L.
+        for point in L:
+            self.append(point)
+
+    def __len__(self):
+        """
+        Returns the number of points in the interpolator.
+        """
+        return len(self.xs)
+
+    def append(self, point):
+        """
+        Takes as input a 2-tuple, i.e., a point, whose x coordinate differs
+        from every point already added, then updates the weights in O(n)
+        time so the polynomial also contains the point.
+        """
+        x, y = point  # Get the coordinates of the new point.
+
+        # Check if this is the first point, whose weight is 1.
+        if not self.xs:
+            self.xs.append(x)
+            self.ys.append(y)
+            self.weights.append(1)
+            self.exponents.append(0)
+            return
+
+        # Find the closest old x, xk, to the new x.
+        k = min(range(len(self.xs)), key=lambda j: abs(self.xs[j] - x))
+        xk = self.xs[k]
+
+        # Loop to divide every old weight by its distance to the new x.
+        for j, xj in enumerate(self.xs):
+            self.weights[j], self.exponents[j] = _normalize(
+                self.weights[j] / (xj - x), self.exponents[j])
+
+        # Calculate the new weight from the weight of xk, as
+        # w = -wk * prod((xk - xj) / (x - xj)) over the old j != k,
+        # whose factors stay close to 1 instead of overflowing
+        # like the product in 1 / prod(x - xj).
+        w = -self.weights[k]
+        for j, xj in enumerate(self.xs):
+            if j != k:
+                w *= (xk - xj) / (x - xj)
+
+        w, exponent = _normalize(w, self.exponents[k])  # Normalize w.
+
+        # Add the new point and its weight.
+        self.xs.append(x)
+        self.ys.append(y)
+        self.weights.append(w)
+        self.exponents.append(exponent)
+
+    def scaledWeights(self):
+        """
+        Returns a list of the weights scaled by a common power of 2 so the
+        largest exponent is 0.  Weights too small to matter next to the
+        largest become 0.0, and exact weights, e.g., Fractions, stay exact.
+        """
+        top = max(self.exponents, default=0)  # Get the largest exponent.
+        return [w * 2 ** (e - top) for w, e in zip(self.weights,
+                                                   self.exponents)]
+
+    def __call__(self, x):
+        """
+        Takes as input a number or a NumPy array, x, then evaluates and
+        returns f(x) in O(n) time per point.  Numbers are evaluated exactly
+        as given, e.g., Fractions stay exact, while arrays are evaluated as
+        floats with NumPy in blocks of BARYCENTRIC_BLOCK_SIZE pairs of query
+        points and nodes.
+        """
+
+        # Check if x is an array of points.
+        if not isinstance(x, Number):
+            return self._evaluateArray(x)
+
+        # Check if there are no points, i.e., f is the zero polynomial.
+        if not self.xs:
+            return 0 * x
+
+        numerator = denominator = 0  # The sums of the barycentric formula.
+
+        # Loop for every point.
+        for xj, yj, wj in zip(self.xs, self.ys, self.scaledWeights()):
+
+            # Check if x is a node, where the formula divides by zero.
+            if x == xj:
+                return yj
+
+            q = wj / (x - xj)  # Calculate the term for this point.
+            numerator += q * yj
+            denominator += q
+
+        return numerator / denominator  # Return f(x).
+
+    def _evaluateArray(self, x):
+        """
+        Takes as input a NumPy array, x, then evaluates and returns f at
+        every point of x, block by block.
+        """
+        import numpy as np  # Import NumPy only when evaluating arrays.
+
+        x = np.asarray(x, dtype=float)  # Make sure x is an array of floats.
+        flat = x.ravel()  # View the points as one dimension.
+        values = np.zeros(flat.shape)  # The values of f at every point.
+
+        # Check if there are no points, i.e., f is the zero polynomial.
+        if not self.xs:
+            return values.reshape(x.shape)
+
+        # Convert the points and weights into arrays.
+        xs = np.array(self.xs, dtype=float)
+        ys = np.array(self.ys, dtype=float)
+        weights = np.array(self.scaledWeights(), dtype=float)
+
+        block = max(1, BARYCENTRIC_BLOCK_SIZE // len(xs))  # Points per block.
+
+        # Loop for every block of points.
+        for start in range(0, flat.size, block):
+            differences = flat[start:start + block, None] - xs
+            nodes = differences == 0  # Find the points that are nodes.
+            differences[nodes] = 1  # Avoid dividing by zero at the nodes.
+
+            # Evaluate the barycentric formula for the whole block.
+            q = weights / differences
+            v = q @ ys / q.sum(axis=1)
+
+            # Set the value of f at the nodes to their y's.
+            rows, columns = np.nonzero(nodes)
+            v[rows] = ys[columns]
+
+            values[start:start + block] = v
+
+        return values.reshape(x.shape)  # Return f at every point.
+
+
+def _normalize(w, exponent):
+    """
+    Takes as input a weight, w, and its power of 2, exponent, then returns
+    them with w moved into [0.5, 1) in absolute value if it is a float.
+    Exact weights, e.g., Fractions, are returned as is.
+    """
+
+    # Check if w is a float that could overflow or underflow.
+    if isinstance(w, float):
+        w, e = frexp(w)  # Split w into its mantissa and power of 2.
+        exponent += e
+
+    return w, exponent  # Return the normalized weight.
+
+
+def chebyshevNodes(n, a=-1, b=1):
+    """
+    Takes as input an integer, n, and an interval, [a, b], then returns a
+    list of the n Chebyshev nodes of the first kind on [a, b], i.e.,
+    (a + b)/2 + (b - a)/2 * cos(pi(2k + 1) / 2n) for k = 0, ..., n - 1.
+    """
+    return [(a + b) / 2 + (b - a) / 2 * cos(pi * (2 * k + 1) / (2 * n))
+            for k in range(n)]
+
+
+class ChebyshevInterpolator:
+    """
+    A class to represent the unique polynomial through the n Chebyshev nodes
+    of [a, b] in Chebyshev form, f(x) = c0 T0(t) + c1 T1(t) + ...,
+    where t maps [a, b] onto [-1, 1].  The coefficients are fitted with a
+    discrete cosine transform through NumPy's FFT in O(n log n) time, and
+    f(x) is evaluated with Clenshaw's recurrence in O(n) time per point,
+    which stays stable for thousands of nodes.
     """
 
-    def dividedDifferences(L):
+    def __init__(self, f, n=None, a=-1, b=1):
         """
-        Takes as input a list, L, that contains 2-tuples representing points,
-        then applies Newton's Divided Difference formula to create a table
-        of divided differences that can be used in Newton Interpolation.
+        The constructor for the ChebyshevInterpolator class.  Takes as input
+        either a function, f, and the number of nodes, n, or a list, f, of
+        the values at chebyshevNodes(len(f), a, b), and an interval, [a, b],
+        then fits the coefficients.
         """
-        length = len(L)  # Get the number of points.
+        import numpy as np  # Import NumPy only when fitting.
+
+        self.a, self.b = a, b  # Set the interval.
 
-        # Instantiate an array of zeros to hold the divided differences.
-        DD = [[0] * (length + 1) for _ in range(length)]
+        # Check if f is a function that needs to be sampled at the nodes.
+        if callable(f):
+            if n is None:
+                raise ValueError("n is required when f is a function.")
+            f = [f(x) for x in chebyshevNodes(n, a, b)]
 
-        # Loop to add the coordinates from L to
-        # the divided difference table, DD.
-        for r in range(length):
-            DD[r][0], DD[r][1] = L[r]  # Set the correct cells.
+        y = np.asarray(f, dtype=float)  # The values at the nodes.
+        n = len(y)  # Get the number of nodes.
 
-        # Loop for every degree in the divided difference table above 1.
-        for degree in range(2, length + 1):
+        # Check if there are no nodes, i.e., f is the zero polynomial.
+        if not n:
+            self.coefficients = y
+            return
 
-            # Loop for every row.
-            for r in range(length - degree + 1):
+        # Calculate the DCT-II of y with an FFT of the even values followed
+        # by the odd values in reverse, i.e., Makhoul's reordering.
+        v = np.concatenate((y[::2], y[1::2][::-1]))
+        shift = np.exp(-0.5j * np.pi * np.arange(n) / n)
+        dct = (shift * np.fft.fft(v)).real
 
-                # Calculate the divided difference.
-                numerator = DD[r+1][degree-1] - DD[r][degree-1]
-                denominator = DD[r+degree-1][0] - DD[r][0]
-                DD[r][degree] = numerator / denominator
+        # Scale the transform into the Chebyshev coefficients.
+        self.coefficients = 2 * dct / n
+        self.coefficients[0] /= 2
 
-        return DD  # Return the table of divided differences.
+    def __len__(self):
+        """
+        Returns the number of nodes in the interpolator.
+        """
+        return len(self.coefficients)
 
-    def interpolate(DD, x):
+    def __call__(self, x):
         """
-        Takes as input a 2D list, DD, that represents a table of divided
-        differences (the output from the above dividedDifferences(L)
-        formula) and an integer, x, then uses Newton's interpolation
-        interpolate the point at x
+        Takes as input a number or a NumPy array, x, then evaluates and
+        returns f(x) with Clenshaw's recurrence.  An array is evaluated at
+        every point at once.
         """
 
-        # Initialize two variables: one to store the
-        # approximation of f(x) and one to store a partial product, p.
-        fx, p = 0, 1
+        # Check if there are no nodes, i.e., f is the zero polynomial.
+        if not len(self.coefficients):
+            return 0 * x
+
+        t = (2 * x - self.a - self.b) / (self.b - self.a)  # Map x to [-1, 1].
+        b1 = b2 = 0  # The last two values of the recurrence.
+
+        # Loop from the last coefficient to the second.
+        for c in self.coefficients[:0:-1]:
+            b1, b2 = 2 * t * b1 - b2 + c, b1
+
+        return t * b1 - b2 + self.coefficients[0]  # Return f(x).
+
+
+# The interpolators available to interpolator(), by mode.
+INTERPOLATORS = {"newton": NewtonInterpolator,
+                 "barycentric": BarycentricInterpolator,
+                 "chebyshev": ChebyshevInterpolator}
+
+
+def interpolator(L=(), mode="newton", **kwargs):
+    """
+    Takes as input the data to interpolate, L, and a mode, then returns an
+    interpolator that evaluates the polynomial at a number or a NumPy array
+    of points when called.  For "newton" and "barycentric", L is a list of
+    2-tuples, i.e., points, and more can be appended.  For "chebyshev", L
+    is a function or its values at the Chebyshev nodes, and n, a, and b are
+    passed as keywords.
+    """
+
+    # Check if the mode is known.
+    if mode not in INTERPOLATORS:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of "
+                         f"{', '.join(INTERPOLATORS)}.")
+
+    return INTERPOLATORS[mode](L, **kwargs)  # Return the interpolator.
+
+
+def NewtonInterpolation(L, x):
+    """
+    Takes as input a list of 2-tuples, i.e., points, L, then
+    interpolates and returns f(x), where f is the unique
+    len(L) - 1 degree polynomial containing all points in L.
+    Uses Newton Interpolation with Divided Differences.  To evaluate
+    the same polynomial more than once, use NewtonInterpolator.
+    """
+    return NewtonInterpolator(L)(x)  # Return the value of f(x).
+
+
+def _derivative(f, x, args=()):
+    """
+    Takes as input a function, f, a number or a NumPy array, x, and any
+    extra arguments of f, args, then returns an approximation of f'(x) with
+    a central difference.
+    """
+    h = FINITE_DIFFERENCE_STEP * (1 + abs(x))  # Scale the step to x.
+    return (f(x + h, *args) - f(x - h, *args)) / (2 * h)
+
+
+def newtonRaphson(f, x0=None, df=None, a=None, b=None, args=(),
+                  tol=NEWTON_TOLERANCE, maxIterations=NEWTON_MAX_ITERATIONS):
+    """
+    Takes as input a function, f, and either a starting point, x0, or a
+    bracket, [a, b], where f(a) and f(b) have opposite signs, then finds a
+    root of f(x, *args) with the Newton-Raphson method.  df is f' and is
+    approximated with central differences if not given.  With a bracket,
+    the bracket is shrunk every iteration and bisection is used whenever
+    the Newton step would leave it or is not at least halving the step
+    before last, so a root is always found.  Returns a dictionary with the
+    root, the number of iterations, and whether the last step was within
+    tol * max(1, |x|).
+    """
+    bracketed = a is not None and b is not None  # Check for a bracket.
+
+    # Check if the bracket is incomplete.
+    if (a is None) != (b is None):
+        raise ValueError("Both a and b are required for a bracket.")
+
+    # Check if there is nowhere to start from.
+    if not bracketed and x0 is None:
+        raise ValueError("Either x0 or a bracket, [a, b], is required.")
+
+    # Check if the bracket is valid and orient it so f(lo) < 0 < f(hi).
+    if bracketed:
+        fa, fb = f(a, *args), f(b, *args)
+
+        # Check if an end of the bracket is a root.
+        if fa == 0 or fb == 0:
+            return {"root": a if fa == 0 else b, "iterations": 0,
+                    "converged": True}
+
+        if (fa > 0) == (fb > 0):
+            raise ValueError("f(a) and f(b) must have opposite signs.")
+
+        lo, hi = (a, b) if fa < 0 else (b, a)
+
+        # Start from the middle unless x0 is strictly inside the bracket.
+        if x0 is None or (x0 - lo) * (x0 - hi) >= 0:
+            x0 = (a + b) / 2
+
+        step = before = abs(b - a)  # The last two step sizes.
+
+    x = x0  # Start from x0.
+
+    # Loop until the step is small enough or there are too many iterations.
+    for iteration in range(maxIterations):
+        fx = f(x, *args)  # Calculate f(x).
+
+        # Check if x is exactly a root.
+        if fx == 0:
+            return {"root": x, "iterations": iteration, "converged": True}
+
+        dfx = df(x, *args) if df else _derivative(f, x, args)  # f'(x).
+
+        if bracketed:
 
-        # Loop for all values except the first in the first
-        # row of the divided difference table, DD.
-        for d in range(1, len(DD[0])):
-            fx += DD[0][d] * p  # Add the partial sum to f(x), fx.
-            p *= x - DD[d - 1][0]  # Update the partial product.
+            # Shrink the bracket to x.
+            if fx < 0:
+                lo = x
+            else:
+                hi = x
 
-        return int(fx)  # Return f(x), fx, the interpolation of x.
+            # Take the Newton step if it stays inside the bracket and it is
+            # at most half the step before last, else bisect.
+            xn = x - fx / dfx if dfx else x
+            if (xn - lo) * (xn - hi) > 0 or abs(2 * fx) > abs(before * dfx):
+                xn = (lo + hi) / 2
 
-    return interpolate(dividedDifferences(L), x)  # Return the value of f(x).
+            before, step = step, abs(x - xn)
+
+        else:
+
+            # Check if the Newton step cannot be taken.
+            if not dfx or not isfinite(xn := x - fx / dfx):
+                return {"root": x, "iterations": iteration,
+                        "converged": False}
+
+            step = abs(x - xn)
+
+        x = xn  # Take the step.
+
+        # Check if the step was small enough.
+        if step <= tol * max(1, abs(x)):
+            return {"root": x, "iterations": iteration + 1, "converged": True}
+
+    return {"root": x, "iterations": maxIterations, "converged": False}
+
+
+def newtonRaphsonBatch(f, x0=None, df=None, a=None, b=None, args=(),
+                       tol=NEWTON_TOLERANCE,
+                       maxIterations=NEWTON_MAX_ITERATIONS):
+    """
+    Takes as input a vectorized function, f, and either NumPy arrays of
+    starting points, x0, or of brackets, [a, b], then solves every equation
+    f(x, *args) = 0 at once like newtonRaphson.  Each array in args holds a
+    parameter per equation, and f and df are only called on the equations
+    that have not converged yet, with args masked to match.  Returns a
+    dictionary with arrays of the roots, the number of iterations of every
+    equation, and whether every equation converged.
+    """
+    import numpy as np  # Import NumPy only when solving batches.
+
+    bracketed = a is not None and b is not None  # Check for a bracket.
+
+    # Check if the bracket is incomplete.
+    if (a is None) != (b is None):
+        raise ValueError("Both a and b are required for a bracket.")
+
+    # Check if there is nowhere to start from.
+    if not bracketed and x0 is None:
+        raise ValueError("Either x0 or a bracket, [a, b], is required.")
+
+    # Broadcast the starting points, brackets, and args to one shape.
+    points = [v for v in (x0, a, b) if v is not None]
+    shape = np.broadcast_shapes(*map(np.shape, points + list(args)))
+
+    # Copy the starting points and brackets into flat float arrays.
+    arrays = [np.broadcast_to(v, shape).astype(float).ravel() for v in points]
+
+    # Flatten every array in args as well.
+    args = [np.broadcast_to(arg, shape).ravel() if np.ndim(arg) else arg
+            for arg in args]
+
+    size = arrays[0].size  # Get the number of equations.
+    iterations = np.zeros(size, dtype=np.int64)  # Iterations per equation.
+    converged = np.zeros(size, dtype=bool)  # Which equations converged.
+
+    # Check if the brackets are valid and orient them so f(lo) < 0 < f(hi).
+    if bracketed:
+        *start, a, b = arrays
+        fa, fb = f(a, *args), f(b, *args)
+
+        if np.any(((fa > 0) == (fb > 0)) & (fa != 0) & (fb != 0)):
+            raise ValueError("f(a) and f(b) must have opposite signs.")
+
+        lo, hi = np.where(fa < 0, a, b), np.where(fa < 0, b, a)
+
+        # Start from the middle unless x0 is strictly inside the bracket.
+        x = (a + b) / 2
+        if start:
+            inside = (start[0] - lo) * (start[0] - hi) < 0
+            x = np.where(inside, start[0], x)
+
+        # Set the roots at the ends of the brackets.
+        x = np.where(fb == 0, b, np.where(fa == 0, a, x))
+        converged = (fa == 0) | (fb == 0)
+
+        step, before = np.abs(b - a), np.abs(b - a)  # The last two steps.
+
+    else:
+        x = arrays[0]
+
+    active = np.flatnonzero(~converged)  # The equations still being solved.
+
+    # Loop until every equation is done or there are too many iterations.
+    for _ in range(maxIterations):
+
+        # Check if every equation is done.
+        if not active.size:
+            break
+
+        # Calculate f(x) and f'(x) for the equations still being solved.
+        xa = x[active]
+        laneArgs = [arg[active] if np.ndim(arg) else arg for arg in args]
+        fx = f(xa, *laneArgs)
+        dfx = df(xa, *laneArgs) if df else _derivative(f, xa, laneArgs)
+
+        zero = fx == 0  # Find the x's that are exactly roots.
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xn = xa - fx / dfx  # Calculate the Newton steps.
+
+        if bracketed:
+
+            # Shrink the brackets to x.
+            negative = fx < 0
+            lo[active] = l = np.where(negative, xa, lo[active])
+            hi[active] = h = np.where(negative, hi[active], xa)
+
+            # Take the Newton steps that stay inside their bracket and are
+            # at most half the step before last, else bisect.
+            newton = ((xn - l) * (xn - h) <= 0) & \
+                (np.abs(2 * fx) <= np.abs(before[active] * dfx))
+            xn = np.where(newton, xn, (l + h) / 2)
+
+            before[active] = step[active]
+            step[active] = s = np.abs(xa - xn)
+            failed = np.zeros(xa.shape, dtype=bool)
+
+        else:
+            failed = ~zero & ~np.isfinite(xn)  # Find the stuck equations.
+            s = np.abs(xa - xn)
+
+        # Take the steps of the equations that are not at a root or stuck.
+        moving = ~zero & ~failed
+        x[active] = np.where(moving, xn, xa)
+        iterations[active] += moving
+
+        # Remove the equations that are done from the active ones.
+        done = zero | (moving & (s <= tol * np.maximum(1, np.abs(xn))))
+        converged[active] = done
+        active = active[~done & ~failed]
+
+    return {"roots": x.reshape(shape), "iterations": iterations.reshape(shape),
+            "converged": converged.reshape(shape)}
 
 
 if __name__ == "__main__":
 
     # Test for interpolation on a line.
     print(NewtonInterpolation([(0, 0), (1, 1)], 5))
+
+    # Test for interpolation on a parabola at many points.
+    # import numpy as np
+    # print(NewtonInterpolator([(0, 0), (1, 1), (2, 4)])(np.arange(5)))
+
+    # Test for appending a point to a line to get a parabola.
+    # f = NewtonInterpolator([(0, 0), (1, 1)])
+    # f.append((2, 4))
+    # print(f(3))
+
+    # Test for interpolating cos on [0, 10] with 64 Chebyshev nodes.
+    # from math import cos
+    # print(interpolator(cos, "chebyshev", n=64, a=0, b=10)(3), cos(3))
+
+    # Test for finding the square root of 2 with and without a bracket.
+    # print(newtonRaphson(lambda x: x * x - 2, 1))
+    # print(newtonRaphson(lambda x: x * x - 2, a=0, b=2))
+
+    # Test for finding the square roots of 1 to 10 at once.
+    # import numpy as np
+    # c = np.arange(1, 11)
+    # print(newtonRaphsonBatch(lambda x, c: x * x - c, a=0, b=c, args=(c,)))
@@ -4,65 +4,377 @@ Date: 18/15/2021
 Description: The Collatz Sequence
 """
 
+import heapq
+import os
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+
+# The lengths of the Collatz Sequences starting at every n less than this
+# are cached in collatzCache, an array of unsigned 16-bit integers where 0
+# means the length has not been calculated yet.
+COLLATZ_CACHE_LIMIT = 1 << 20
+collatzCache = array("H", bytes(2 * COLLATZ_CACHE_LIMIT))
+collatzCache[1] = 1  # The Collatz Sequence starting at 1 has length 1.
+
+# The most lengths of Collatz Sequences starting at n >= COLLATZ_CACHE_LIMIT
+# kept in largeCollatzCache, evicting the least recently used length once
+# it is full.  Set this to 0 to disable the cache for large n.
+LARGE_COLLATZ_CACHE_SIZE = 1 << 16
+largeCollatzCache = OrderedDict()
+
+# The number of steps of the map T(n) = n / 2 if n is even and
+# T(n) = (3n + 1) / 2 otherwise taken at once by collatzLengths, using
+# lookup tables with 2^COLLATZ_JUMP_BITS entries.
+COLLATZ_JUMP_BITS = 16
+
+# The largest table of lengths of Collatz Sequences kept by collatzLengths
+# (uint16, so 64 MiB) and the number of starting values it advances at once.
+COLLATZ_TABLE_LIMIT = 1 << 25
+COLLATZ_BATCH_SIZE = 1 << 20
+
+# The lookup tables used by collatzLengths, built on first use.  For every
+# b < 2^COLLATZ_JUMP_BITS, with k = COLLATZ_JUMP_BITS and c(b) the number
+# of odd steps in the first k steps of T from b, T^k(2^k a + b) =
+# 3^c(b) a + T^k(b), which takes k + c(b) steps of the Collatz Sequence.
+# _jumpLimits[b] is the largest a for which this fits in a uint64.
+_jumpPowers = _jumpOffsets = _jumpSteps = _jumpLimits = None
+
+# _collatzTable[m] is the length of the Collatz Sequence starting at m
+# for every 1 <= m < len(_collatzTable).  Built and grown by collatzLengths.
+_collatzTable = None
+
 
 def collatzSequenceLength(n):
     """
     Takes as input n, then computes and returns the
     length of the Collatz Sequence starting at n.
     """
+    length = 1  # The sequence starting at n contains n.
 
-    # If n is 1, then terminate.
-    if n == 1:
-        return 1  # Return 1.
-
-    # Return the 1 plus the length of the Collatz Sequence
-    # starting at the next number. n -> n / 2 if n is even
+    # Loop until n is 1.  n -> n / 2 if n is even
     # and n -> 3 * n + 1 otherwise.
-    return 1 + collatzSequenceLength(3 * n + 1 if n % 2 else n / 2)
+    while n > 1:
+        n = 3 * n + 1 if n & 1 else n >> 1  # Move to the next number.
+        length += 1  # Count the next number.
+
+    return length  # Return the length of the sequence.
+
+
+def collatzLength(n):
+    """
+    Takes as input a positive integer, n, then computes and returns the
+    length of the Collatz Sequence starting at n.  Steps forward with
+    integer arithmetic until a number with a cached length is reached,
+    then walks back along the path caching the length of every number on
+    it, in collatzCache if it is small and in largeCollatzCache otherwise.
+    Returns None if n < 1.
+    """
+
+    # Make sure a valid n was entered.
+    if n < 1:
+        return None  # Return None if a number less than 1 was entered.
+
+    path = []  # The numbers visited whose lengths are not cached.
+
+    # Loop until a number with a cached length is reached.
+    while True:
+
+        # Check if n is small and its length is in the array.
+        if n < COLLATZ_CACHE_LIMIT:
+            if length := collatzCache[n]:
+                break
+
+        # Check if n is large and its length is in the LRU cache.
+        elif n in largeCollatzCache:
+            largeCollatzCache.move_to_end(n)  # Mark it as recently used.
+            length = largeCollatzCache[n]  # Get the cached length.
+            break
+
+        path.append(n)  # Remember n so its length can be cached.
+        n = 3 * n + 1 if n & 1 else n >> 1  # Move to the next number.
+
+    # Loop back along the path, caching the length of every number on it.
+    for m in reversed(path):
+        length += 1  # The sequence starting at m is one longer.
+
+        # Cache the length in the array if m is small.
+        if m < COLLATZ_CACHE_LIMIT:
+            collatzCache[m] = length
+
+        # Otherwise, cache it in the LRU cache if it is enabled.
+        elif LARGE_COLLATZ_CACHE_SIZE:
+            largeCollatzCache[m] = length
+            if len(largeCollatzCache) > LARGE_COLLATZ_CACHE_SIZE:
+                largeCollatzCache.popitem(last=False)  # Evict the oldest.
+
+    return length  # Return the length of the Collatz Sequence.
 
 
 def memoizedCollatzSequenceLength(n, d):
     """
-    Takes as input n, then calls the helper function to do the work to
-    compute and return the length of the Collatz Sequence starting at n.
+    Takes as input n and a dictionary, d, then computes and returns the
+    length of the Collatz Sequence starting at n along with d, where
+    d[m] is the length of the Collatz Sequence starting at m for every
+    m on the sequence whose length has been computed.  Kept for callers
+    that manage their own cache; collatzLength manages its own.
+    """
+    path = []  # The numbers visited whose lengths are not in d.
+
+    # Loop until 1 or a number whose length is in d is reached.
+    while n != 1 and n not in d:
+        path.append(n)  # Remember n so its length can be stored.
+        n = 3 * n + 1 if n & 1 else n >> 1  # Move to the next number.
+
+    length = d.get(n, 1)  # The length of the sequence starting at n.
+
+    # Loop back along the path, storing the length of every number on it.
+    for m in reversed(path):
+        length += 1  # The sequence starting at m is one longer.
+        d[m] = length  # Store the length in the dictionary.
+
+    # Return the length of the Collatz Sequence starting at n and d.
+    return length, d
+
+
+def _buildCollatzTables():
+    """
+    Builds the lookup tables used to take COLLATZ_JUMP_BITS steps of T at
+    once, then the table of lengths of the Collatz Sequences starting
+    below 2^COLLATZ_JUMP_BITS (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+    global _jumpPowers, _jumpOffsets, _jumpSteps, _jumpLimits, _collatzTable
+
+    k = COLLATZ_JUMP_BITS  # The number of steps of T to take at once.
+    offsets = np.arange(1 << k, dtype=np.uint64)  # Start with T^0(b) = b.
+    odd = np.zeros(1 << k, dtype=np.uint64)  # The odd steps taken from b.
+
+    # Apply T to every b at once k times, counting the odd steps.
+    for _ in range(k):
+        isOdd = offsets & np.uint64(1)
+        offsets = np.where(isOdd, (3 * offsets + 1) >> np.uint64(1),
+                           offsets >> np.uint64(1))
+        odd += isOdd
+
+    powers = np.uint64(3) ** odd  # Calculate 3^c(b) for every b.
+    _jumpPowers, _jumpOffsets = powers, offsets
+    _jumpSteps = (odd + np.uint64(k)).astype(np.uint16)
+    _jumpLimits = (np.uint64(2 ** 64 - 1) - offsets) // powers
+
+    # Start with the length of the sequence starting at 1, then
+    # fill in every length below 2^k.
+    _collatzTable = np.array([0, 1], dtype=np.uint16)
+    _extendCollatzTable(1 << k)
+
+
+def _extendCollatzTable(hi):
+    """
+    Takes as input a positive integer, hi, then extends the table of
+    lengths of Collatz Sequences to cover every starting value less than
+    min(hi, COLLATZ_TABLE_LIMIT), at most doubling it at a time so each
+    new part can use the part before it (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+    global _collatzTable
+
+    # Loop until the table is long enough.
+    while len(_collatzTable) < min(hi, COLLATZ_TABLE_LIMIT):
+        lo = len(_collatzTable)  # The first starting value not covered.
+        new = min(2 * lo, hi, COLLATZ_TABLE_LIMIT, lo + COLLATZ_BATCH_SIZE)
+
+        # Calculate the new lengths and add them to the table.
+        lengths = _collatzLengthsOf(np.arange(lo, new, dtype=np.uint64))
+        _collatzTable = np.concatenate((_collatzTable, lengths))
+
+
+def _collatzLengthsOf(starts):
+    """
+    Takes as input a NumPy array of positive uint64 starting values,
+    starts, then calculates and returns a NumPy array of the lengths of
+    their Collatz Sequences.  All sequences are advanced in lock-step
+    until they reach a value in the table: values of at least
+    2^COLLATZ_JUMP_BITS take COLLATZ_JUMP_BITS steps of T at once through
+    the lookup tables, and smaller ones take single steps.  Sequences that
+    would overflow a uint64 are finished by collatzLength (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+
+    result = np.empty(len(starts), dtype=np.uint16)  # The lengths.
+    index = np.arange(len(starts))  # The positions still being advanced.
+    current = starts.copy()  # The current value of every sequence.
+    steps = np.zeros(len(starts), dtype=np.uint16)  # The steps taken.
+    mask, k = np.uint64((1 << COLLATZ_JUMP_BITS) - 1), np.uint64(
+        COLLATZ_JUMP_BITS)
+
+    # Loop until every sequence has reached the table.
+    while index.size:
+
+        # Finish the sequences that reached a value in the table.
+        done = current < len(_collatzTable)
+        result[index[done]] = steps[done] + _collatzTable[current[done]]
+
+        # Finish the sequences that are about to overflow with integers.
+        low, high = current & mask, current >> k
+        overflow = (high > _jumpLimits[low]) & ~done
+        for i, value, taken in zip(index[overflow], current[overflow],
+                                   steps[overflow]):
+            result[i] = int(taken) + collatzLength(int(value))
+
+        # Keep only the sequences that are still being advanced.
+        keep = ~(done | overflow)
+        index, current, steps = index[keep], current[keep], steps[keep]
+        low, high = low[keep], high[keep]
+
+        # Take one step from small values and a jump from large ones.
+        small = current <= mask
+        single = np.where(current & np.uint64(1),
+                          3 * current + np.uint64(1), current >> np.uint64(1))
+        current = np.where(small, single,
+                           high * _jumpPowers[low] + _jumpOffsets[low])
+        steps += np.where(small, np.uint16(1), _jumpSteps[low])
+
+    return result  # Return the lengths of the sequences.
+
+
+def collatzLengths(lo, hi):
+    """
+    Takes as input two positive integers, lo and hi, with hi <= 2^64,
+    then computes and returns a NumPy array of uint16 holding the length of
+    the Collatz Sequence starting at n for every lo <= n < hi.  Whole
+    batches of sequences are advanced in lock-step with vectorized lookups
+    that take COLLATZ_JUMP_BITS steps at once, stopping as soon as they
+    reach a value whose length is already in the shared table.  The table
+    grows to cover [1, hi) when the range starts inside it (Requires NumPy).
     """
-    def memoizedCollatzSequenceLengthHelper(n):
-        """
-        Takes as input n, then computes and returns the
-        length of the Collatz Sequence starting at n.
-        """
+    import numpy as np  # Import NumPy only when it is needed.
+
+    # Make sure a valid range was entered.
+    if lo < 1:
+        raise ValueError("lo must be a positive integer.")
+
+    # Build the lookup tables if this is the first call.
+    if _collatzTable is None:
+        _buildCollatzTables()
 
-        # If n is 1, then terminate.
-        if n == 1:
-            return 1  # Return 1.
+    # Grow the table over the range if it starts inside the table.
+    if lo <= len(_collatzTable) < hi:
+        _extendCollatzTable(hi)
 
-        # If n is divisible by 2 (even), then terminate.
-        if n % 2 == 0:
+    result = np.empty(max(hi - lo, 0), dtype=np.uint16)  # The lengths.
+    split = min(max(lo, len(_collatzTable)), hi)  # The end of the table.
+    result[:split - lo] = _collatzTable[lo:split]  # Copy from the table.
+
+    # Loop for every batch of the range past the table.
+    for start in range(split, hi, COLLATZ_BATCH_SIZE):
+        end = min(start + COLLATZ_BATCH_SIZE, hi)  # The end of the batch.
+        result[start - lo:end - lo] = _collatzLengthsOf(
+            np.arange(start, end, dtype=np.uint64))
+
+    return result  # Return the lengths.
+
+
+def _initializeCollatzWorker(cacheSize):
+    """
+    Takes as input a positive integer, cacheSize, then builds the lookup
+    tables and the table of lengths of Collatz Sequences starting below
+    cacheSize in the worker process, so every chunk it searches can use
+    them (Requires NumPy).
+    """
+    _buildCollatzTables()  # Build the lookup tables.
+    _extendCollatzTable(cacheSize)  # Build the local table of lengths.
+
+
+def _searchCollatzChunk(task):
+    """
+    Takes as input a 4-tuple, task, of three positive integers, lo, hi,
+    and limit, and a positive integer, top, then computes the lengths of
+    the Collatz Sequences starting at the odd m in [lo, hi) that can lead
+    to one of the top longest sequences starting below limit.  Returns the
+    top (length, n) pairs found, where n = m * 2^v < limit, and the number
+    of starting values whose lengths were computed (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when it is needed.
+    lo, hi, limit, top = task  # Unpack the task.
+
+    # Get the odd starting values in the chunk.  If only the longest
+    # sequence is needed, skip m = 5 mod 6, as (2m - 1) / 3 is a smaller odd
+    # number whose sequence passes through 2m, so it is two steps longer.
+    starts = np.arange(lo | 1, hi, 2, dtype=np.uint64)
+    if top == 1:
+        starts = starts[starts % np.uint64(6) != 5]
+    lengths = _collatzLengthsOf(starts).astype(np.int64)
+
+    # Calculate the largest v with m * 2^v < limit for every m, exactly,
+    # from the bit lengths of m and limit - 1.
+    shift = (limit - 1).bit_length() - np.frexp(starts.astype(np.float64))[1]
+    shift -= (starts << shift.astype(np.uint64)) > np.uint64(limit - 1)
+
+    # The sequence starting at m * 2^v is v steps longer than the one
+    # starting at m, and the ones starting at m * 2^(v + 1), ..., which are
+    # all below limit, are longer still.  So only the top largest v can
+    # give one of the top longest sequences.  For m = 5 mod 6, the
+    # sequences starting at ((2m - 1) / 3) * 2^w for w >= v are longer too,
+    # so only the top // 2 largest v can.
+    window = np.where(starts % np.uint64(6) == 5, top // 2, top)
+    candidates = []  # The (length, n) arrays of the candidates.
+
+    # Loop for every offset from the largest v.
+    for j in range(top):
+        keep = (j < window) & (shift >= j)
+        v = (shift[keep] - j).astype(np.uint64)
+        candidates.append((lengths[keep] + v.astype(np.int64),
+                           starts[keep] << v))
+
+    # Find the top longest sequences among the candidates.
+    length = np.concatenate([c[0] for c in candidates])
+    n = np.concatenate([c[1] for c in candidates])
+    best = np.argsort(-length, kind="stable")[:top]
+    return ([(int(length[i]), int(n[i])) for i in best], len(starts))
+
+
+def longestCollatzChain(limit, workers=None, top=1, chunkSize=1 << 20,
+                        cacheSize=1 << 22):
+    """
+    Takes as input a positive integer, limit, below 2^53, and optional
+    positive integers, workers, top, chunkSize, and cacheSize, then finds
+    the top longest Collatz Sequences starting below limit.  The range is
+    split into chunks of chunkSize that idle worker processes (by default,
+    one per CPU) take from a shared queue, and every worker keeps its own
+    table of the lengths of sequences starting below cacheSize.  Even
+    starting values are never computed, as the sequence starting at n * 2^v
+    is v steps longer than the one at n, and neither are others that
+    cannot be among the top.  Returns a dictionary with the records, a
+    list of (length, n) pairs, longest first, the number of starting
+    values computed, the elapsed seconds, and the values per second
+    (Requires NumPy).
+    """
+    workers = workers or os.cpu_count() or 1  # Get the number of workers.
+    started = time.perf_counter()  # Start the timer.
+    tasks = [(lo, min(lo + chunkSize, limit), limit, top)
+             for lo in range(1, limit, chunkSize)]
 
-            # If n / 2 is in the dictionary, then return the
-            # value already calculated that has been stored.
-            if n / 2 in d:
-                return d[n / 2]  # Return the calculated dictionary value.
+    # Search every chunk in a worker process, taking chunks one at a time.
+    with ProcessPoolExecutor(workers, initializer=_initializeCollatzWorker,
+                             initargs=(min(cacheSize, limit),)) as executor:
+        results = list(executor.map(_searchCollatzChunk, tasks, chunksize=1))
 
-            # Calculate and store in the dictionary, d, 1 plus
-            # the length of the Collatz Sequence starting
-            # at the next number. n -> n / 2 since n is odd.
-            d[n / 2] = 1 + memoizedCollatzSequenceLengthHelper(n / 2)
+    # Merge the records of every chunk, breaking ties by the smaller start.
+    records = heapq.nsmallest(top, (r for chunk, _ in results for r in chunk),
+                              key=lambda r: (-r[0], r[1]))
+    computed = sum(count for _, count in results)  # Values computed.
+    seconds = time.perf_counter() - started  # The elapsed time.
 
-            return d[n / 2]  # Return the calculated dictionary value.
+    # Return the records and the throughput statistics.
+    return {"records": records, "computed": computed, "seconds": seconds,
+            "perSecond": computed / seconds if seconds else 0.0}
 
-        # If 3n + 1 is in the dictionary, then return the
-        # value already calculated that has been stored.
-        if 3 * n + 1 in d:
-            return d[3 * n + 1]  # Return the calculated dictionary value.
 
-        # Calculate and store in the dictionary, d, 1 plus
-        # the length of the Collatz Sequence starting
-        # at the next number. n -> 3n + 1 since n is odd.
-        d[3 * n + 1] = 1 + memoizedCollatzSequenceLengthHelper(3 * n + 1)
+if __name__ == "__main__":
 
-        return d[3 * n + 1]  # Return the calculated dictionary value.
+    # print(collatzLength(27))  # The length of the sequence starting at 27.
 
-    # Return the helpers return value, the length
-    # of the Collatz Sequence starting at n.
-    return memoizedCollatzSequenceLengthHelper(n), d
+    # Find the longest Collatz Sequence starting below 10^6.
+    print(longestCollatzChain(10 ** 6))
@@ -0,0 +1,5 @@
+"""
+Author: Ryan Adoni
+Date: 9/22/2021
+Description: Functions relating to integer sequences.
+"""
@@ -0,0 +1,529 @@
+"""
+Author: Ryan Adoni
+Date: 9/22/2021
+Description: Functions relating to the Fibonacci Sequence.  The
+implementations from Fibonacci.ipynb live here so they can be imported
+without running the notebook.  Importing this module has no side effects:
+NumPy is only imported by recursiveMatrixFibonacci and timeit only by
+timeFibonacci, and the recursion limit is left alone.
+"""
+
+from collections import OrderedDict
+from functools import cache, lru_cache
+from math import gcd, isqrt, sqrt
+
+
+# The most Fibonacci numbers kept by memoizedFibonacci.  Once the cache is
+# full, the least recently used number is evicted.
+FIBONACCI_CACHE_SIZE = 1 << 12
+
+# A bounded cache mapping n to F(n), shared by every call of
+# memoizedFibonacci in the process.
+fibonacciCache = OrderedDict()
+
+# Moduli larger than this are not reduced by their Pisano period in fib,
+# even if asked, since finding the period requires factoring the modulus.
+PISANO_LIMIT = 1 << 40
+
+
+def _fibPair(n, mod=None):
+    """
+    Takes as input a non-negative integer, n, and an optional positive
+    integer, mod, then returns the 2-tuple (F(n), F(n + 1)), reduced mod
+    mod if it is given, using fast doubling:
+    F(2k) = F(k) * (2F(k + 1) - F(k)) and F(2k + 1) = F(k)^2 + F(k + 1)^2.
+    """
+    a, b = 0, 1  # Start with (F(0), F(1)).
+
+    # Loop over the bits of n from the most significant to the least.
+    for bit in range(n.bit_length() - 1, -1, -1):
+
+        # Double k, i.e., move from (F(k), F(k + 1)) to (F(2k), F(2k + 1)).
+        c = a * ((b << 1) - a)
+        d = a * a + b * b
+        if mod is not None:
+            c, d = c % mod, d % mod
+
+        # If the bit is set, move one more step to (F(2k + 1), F(2k + 2)).
+        a, b = (d, c + d) if n >> bit & 1 else (c, d)
+        if mod is not None:
+            b %= mod
+
+    return a, b  # Return (F(n), F(n + 1)).
+
+
+def _fibSingle(n, mod=None):
+    """
+    Takes as input a non-negative integer, n, and an optional positive
+    integer, mod, then returns F(n), reduced mod mod if it is given.  Uses
+    _fibPair for (F(k), F(k + 1)) with k = n // 2, then only the half of
+    the last doubling step that gives F(n), i.e., F(2k) = F(k) * (2F(k + 1)
+    - F(k)) or F(2k + 1) = F(k)^2 + F(k + 1)^2, since that step has the
+    largest numbers and F(n + 1) is not needed.
+    """
+    a, b = _fibPair(n >> 1, mod)  # Get (F(k), F(k + 1)).
+    value = a * a + b * b if n & 1 else a * ((b << 1) - a)  # Get F(n).
+    return value if mod is None else value % mod  # Return F(n).
+
+
+def fib(n, mod=None, pisano=False):
+    """
+    Takes as input a non-negative integer, n, and an optional positive
+    integer, mod, then returns the nth Fibonacci number, or the nth
+    Fibonacci number mod mod if mod is given, in O(log n) arithmetic
+    operations using fast doubling.  If pisano is True and mod is at most
+    PISANO_LIMIT, n is first reduced by the Pisano period of mod.  That
+    saves only a few doubling steps but factors mod the first time it is
+    seen, so it only pays off when the same modulus is used many times.
+    Returns None if n < 0.
+    """
+
+    # Make sure a valid n was entered.
+    if n < 0:
+        return None  # Return None if a number less than 0 was entered.
+
+    # Check if only the value mod mod is needed.
+    if mod is not None:
+
+        # Reduce n by the Pisano period, which is cached per modulus.
+        if pisano and mod <= PISANO_LIMIT:
+            n %= pisanoPeriod(mod)
+
+        return _fibSingle(n, mod)  # Return F(n) mod mod.
+
+    return _fibSingle(n)  # Return F(n).
+
+
+def _factor(n):
+    """
+    Takes as input a positive integer, n, then returns a dictionary
+    mapping every prime factor of n to its exponent using trial division.
+    """
+    factors = {}  # A dictionary to store the prime factorization.
+    p = 2  # Start at 2, the first prime number.
+
+    # Loop until p^2 > n.
+    while p * p <= n:
+
+        # Divide out p from n as many times as possible.
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+        p += 1 if p == 2 else 2  # Move to the next odd number.
+
+    # Add the last prime factor of n if there is one.
+    if n > 1:
+        factors[n] = factors.get(n, 0) + 1
+
+    return factors  # Return the prime factorization of n.
+
+
+def _primePisanoPeriod(p):
+    """
+    Takes as input a prime, p, then returns the Pisano period of p, the
+    smallest positive k with F(k) = 0 and F(k + 1) = 1 mod p.  The period
+    divides p - 1 if p = +-1 mod 5 and 2(p + 1) if p = +-2 mod 5, so it
+    is found by dividing prime factors out of that bound while possible.
+    """
+
+    # Deal with the primes whose periods do not follow the rule.
+    if p == 2:
+        return 3
+    if p == 5:
+        return 20
+
+    period = p - 1 if p % 5 in (1, 4) else 2 * (p + 1)  # The bound.
+
+    # Loop for every prime factor of the bound and divide it out of the
+    # period as long as the result is still a period.
+    for q in _factor(period):
+        while period % q == 0 and _fibPair(period // q, p) == (0, 1):
+            period //= q
+
+    return period  # Return the Pisano period of p.
+
+
+@lru_cache(maxsize=128)
+def pisanoPeriod(m):
+    """
+    Takes as input a positive integer, m, then returns the Pisano period
+    of m, the period of the Fibonacci numbers mod m, so F(n) = F(n mod
+    pisanoPeriod(m)) mod m.  Uses pi(p^e) = p^(e - 1) * pi(p) for prime
+    powers and takes the least common multiple over the prime factors.
+    """
+    period = 1  # Start with the period of 1.
+
+    # Loop for every prime power dividing m.
+    for p, e in _factor(m).items():
+        q = _primePisanoPeriod(p) * p ** (e - 1)  # The period of p^e.
+        period = period * q // gcd(period, q)  # Take the lcm.
+
+    return period  # Return the Pisano period of m.
+
+
+def fibRange(lo, hi, chunkSize=1024):
+    """
+    Takes as input two non-negative integers, lo and hi, and an optional
+    positive integer, chunkSize, then generates the Fibonacci numbers F(lo),
+    F(lo + 1), ..., F(hi - 1) in lists of chunkSize numbers (the last list
+    may be shorter).  F(lo) and F(lo + 1) are found by fast doubling, so
+    the numbers before lo are never calculated.
+    """
+    a, b = _fibPair(lo) if lo < hi else (0, 1)  # Jump to (F(lo), F(lo + 1)).
+
+    # Loop for every chunk in [lo, hi).
+    for start in range(lo, hi, chunkSize):
+        chunk = []  # A list to store the chunk.
+
+        # Loop for every Fibonacci number in the chunk.
+        for _ in range(min(chunkSize, hi - start)):
+            chunk.append(a)  # Add the Fibonacci number to the chunk.
+            a, b = b, a + b  # Move to the next Fibonacci number.
+
+        yield chunk  # Yield the chunk.
+
+
+def fibRangeMod(lo, hi, mod):
+    """
+    Takes as input two non-negative integers, lo and hi, and a positive
+    integer, mod, less than 2^63, then calculates and returns a NumPy
+    array of uint64 holding F(i) mod mod for every lo <= i < hi.  The range
+    is split into about sqrt(hi - lo) lanes of consecutive indices whose
+    starting pairs are found by fast doubling, then all lanes are advanced
+    in lock-step with vectorized additions (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when this function is used.
+
+    # Make sure the sum of two residues fits in a uint64.
+    if not 0 < mod < 1 << 63:
+        raise ValueError("mod must be in [1, 2^63).")
+
+    count = max(hi - lo, 0)  # The number of Fibonacci numbers to find.
+    lanes = max(isqrt(count), 1)  # The number of lanes.
+    steps = -(-count // lanes)  # The number of indices in each lane.
+
+    # Find (F(start), F(start + 1)) mod mod for the start of every lane.
+    pairs = [_fibPair(lo + lane * steps, mod) for lane in range(lanes)]
+    a = np.array([p[0] for p in pairs], dtype=np.uint64) % np.uint64(mod)
+    b = np.array([p[1] for p in pairs], dtype=np.uint64) % np.uint64(mod)
+    c = np.empty_like(a)  # A buffer for the next Fibonacci numbers.
+    table = np.empty((lanes, steps), dtype=np.uint64)  # Lane i is row i.
+
+    # Loop for every step, filling one column of every lane at once.
+    for step in range(steps):
+        table[:, step] = a  # Store F(i) mod mod for every lane.
+
+        # Calculate (a + b) mod mod without overflowing or dividing.
+        np.add(a, b, out=c)
+        np.subtract(c, np.uint64(mod), out=c, where=c >= mod)
+        a, b, c = b, c, a  # Move every lane forward by one.
+
+    return table.reshape(-1)[:count]  # Return the values in order.
+
+
+def recursiveFibonacci(n):
+    """
+    An implementation of the Fibonacci sequence using recursion
+    (a pretty poor implementation).  Takes in a positive integer
+    or zero, n, and returns the nth Fibonacci number.
+    """
+
+    # Make sure a valid n was entered.
+    if n < 0:
+        return None  # Return None if a number less than 0 was entered.
+
+    # The base case for the recursion.
+    if n <= 2:
+
+        # Return 1 for the first and second Fibonacci
+        # number.  Return 0 for the zeroth Fibonacci number.
+        return 0 if n == 0 else 1
+
+    # Recurse to return the nth Fibonacci number.
+    return recursiveFibonacci(n-1) + recursiveFibonacci(n-2)
+
+
+def recursiveMemoizedFibonacci(n):
+    """
+    An implementation of the Fibonacci sequence using
+    memoized recursion.  Takes in a positive integer
+    or zero, n, and returns the nth Fibonacci number.
+    """
+
+    # A dictionary to store Fibonacci values
+    # that have been calculated already.
+    FibonacciDictionary = {}
+
+    def recursiveMemoizedFibonacciHelper(n):
+        # Make sure a valid n was entered.
+        if n < 0:
+            return None  # Return None if a number less than 0 was entered.
+
+        # The base case for the recursion.
+        if n <= 2:
+
+            # Return 1 for the first and second Fibonacci number.
+            # Return 0 for the zeroth Fibonacci number.
+            return 0 if n == 0 else 1
+
+        # Check if the n-1th Fibonacci number has been calculated already.
+        if n - 1 not in FibonacciDictionary:
+
+            # Calculate the value of the n-1st Fibonacci value and
+            # at it to the dictionary, FibonacciDictionary.
+            FibonacciDictionary[n-1] = recursiveMemoizedFibonacciHelper(n-1)
+
+        # Check if the n-2nd Fibonacci number has been calculated already.
+        if n - 2 not in FibonacciDictionary:
+
+            # Calculate the value of the n-2st Fibonacci value and
+            # at it to the dictionary, FibonacciDictionary.
+            FibonacciDictionary[n-2] = recursiveMemoizedFibonacciHelper(n-2)
+
+        # Recurse to return the nth Fibonacci number.
+        return FibonacciDictionary[n-1] + FibonacciDictionary[n-2]
+
+    # Return the output of the helper function.
+    return recursiveMemoizedFibonacciHelper(n)
+
+
+@cache  # Memoizes the function using native Python.
+def recursiveNativeMemoizedFibonacci(n):
+    """
+    An implementation of the Fibonacci sequence using
+    memoized recursion.  Takes in a positive integer
+    or zero, n, and returns the nth Fibonacci number.
+    """
+
+    # Make sure a valid n was entered.
+    if n < 0:
+        return None  # Return None if a number less than 0 was entered.
+
+    # The base case for the recursion.
+    if n <= 2:
+
+        # Return 1 for the first and second Fibonacci
+        # number.  Return 0 for the zeroth Fibonacci number.
+        return 0 if n == 0 else 1
+
+    # Recurse to return the nth Fibonacci number.
+    return (recursiveNativeMemoizedFibonacci(n-1)
+            + recursiveNativeMemoizedFibonacci(n-2))
+
+
+def memoizedFibonacci(n):
+    """
+    An implementation of the Fibonacci sequence using a bounded cache,
+    fibonacciCache, shared by every call.  Takes in a positive integer or
+    zero, n, and returns the nth Fibonacci number.  Misses are calculated
+    iteratively by fast doubling, so no recursion is used and the stack
+    cannot overflow, and at most FIBONACCI_CACHE_SIZE numbers are kept.
+    """
+
+    # Make sure a valid n was entered.
+    if n < 0:
+        return None  # Return None if a number less than 0 was entered.
+
+    # Check if the nth Fibonacci number has been calculated already.
+    if n in fibonacciCache:
+        fibonacciCache.move_to_end(n)  # Mark it as the most recently used.
+        return fibonacciCache[n]  # Return the cached value.
+
+    value = fibonacciCache[n] = _fibSingle(n)  # Calculate and store F(n).
+
+    # Evict the least recently used number if the cache is too big.
+    if len(fibonacciCache) > FIBONACCI_CACHE_SIZE:
+        fibonacciCache.popitem(last=False)
+
+    return value  # Return the nth Fibonacci number.
+
+
+def recursiveMatrixFibonacci(N):
+    """
+    An implementation of the Fibonacci sequence using the matrix
+    representation of Fibonacci numbers.  Takes in a positive
+    integer or zero, N, and returns the Nth Fibonacci number (Requires NumPy).
+    """
+    import numpy as np  # Import NumPy only when this function is used.
+
+    A = np.array([[1, 1], [1, 0]])  # Ininitialize the matrix, A.
+
+    def helper(n, F):
+        """
+        A helper function to execute most of the work and so
+        A is not repeatedly instantiated on the recursive
+        stack.  Takes in the current Fibonacci number, n,
+        and a matrix representation of Fn and Fn+1, F.
+        """
+
+        # Base case.  Checks if n is equal to N.
+        if n == N:
+            return F[0][0]  # return the Nth Fibonacci number.
+
+        # Call the helper.  Increment n and dot A with F.
+        return helper(n + 1, A @ F)
+
+    # Call and return the helper using
+    # it's initial values.
+    return helper(0, np.array([[0], [1]]))
+
+
+def fibonacciGenerator():
+    """
+    A generator to generate numbers in the Fibonacci sequence sequentially
+    """
+    nFib = nPlusOnefib = 1  # Set the nth and n+1th Fibonacci number.
+
+    # Loop forever.
+    while True:
+        yield nFib  # Yield nth Fibonacci number.
+        nPlusTwoFib = nFib + nPlusOnefib  # Calculate next Fibonacci number.
+        nFib = nPlusOnefib  # Update nth Fibonacci number.
+        nPlusOnefib = nPlusTwoFib  # Update n+1th Fibonacci number.
+
+
+def generatorFibonacci(n):
+    """
+    Takes as input a positive integer, n, then uses a Python
+    generator to generate the nth Fibonacci nummber.
+    """
+    fibGenerator = fibonacciGenerator()  # Instantiate the Fibonacci generator.
+
+    # Loop for n - 1 times to calcualte the n-1st Fibonacci number.
+    for _ in range(n-1):
+        next(fibGenerator)  # Calculate the next Fibonacci number.
+
+    return next(fibGenerator)  # Return the nth Fibonacci number.
+
+
+def iterativeFibonacci(n):
+    """
+    An implementation of the Fibonacci sequence using iteration.  Takes
+    in a positive integer or zero, n, and returns the nth Fibonacci number.
+    """
+
+    # Make sure a valid n was entered.
+    if n <= 0:
+
+        # Return None if a number less than 0
+        # was entered and 0 if 0 was entered.
+        return None if n < 0 else 0
+
+    # Set two variables representing the
+    # nth and n+1th Fibonacci numbers.
+    n0, n1 = 0, 1
+
+    # Loop until n is 0 and decrement n each iteration.
+    while (n := n-1):
+
+        # Set n0 to n1 and n1 to the sum
+        # of the previous two numbers.
+        n0, n1 = n1, n0 + n1
+
+    return n1  # return n0, the nth Fibonacci number.
+
+
+def binetFibonacci(n):
+    """
+    An implementation of the Fibonacci sequence using the Binet formula,
+    the fact that the nth Fibonacci number satisfies the following
+    equation: Fn =  [phi^n / sqrt(5)] where phi = (1 + sqrt(5)) / 2 and
+    [] represents the closest integer function.  Takes in a positive
+    integer or zero, n, and returns the nth Fibonacci number.
+    """
+
+    # Use a simplified version of the Binet formula to
+    # calculate and return the nth Fibonacci number.
+    return round(((1 + sqrt(5)) / 2) ** n / sqrt(5))
+
+
+def wrapper(func, *args, **kwargs):
+    """
+    Define a wrapper to pass functions to the timeit function
+    """
+    def wrapped():
+        """
+        A helper function.
+        """
+        return func(*args, **kwargs)  # Call and return the wrapped function.
+
+    return wrapped  # Return the wrapper.
+
+
+def timeFibonacci(functions, n, attempts):
+    """
+    Takes as input a list of functions that map positive integers
+    to their nth Fibonacci numbers, functions, and two positive
+    integers, n and attempts and times the Fibonacci functions on
+    input n for attempts times.  The function times each funtion
+    and prints the timing results of each function in functions ran
+    attempts times and averaged over the number of attempts.
+    """
+    import timeit  # Import timeit only when timing.
+
+    # Loop for all functions in lst.
+    for function in functions:
+
+        # Calculate the average time to run the function on n
+        # attempts times and print the result nicely.
+        time = timeit.timeit(wrapper(function, n), number=attempts)
+        print(f"{function.__name__} ran for {time} seconds on average over"
+              f" {attempts} function calls.")
+
+
+def benchmarkMemoizedFibonacci(n, attempts):
+    """
+    Takes as input two positive integers, n and attempts, then times the
+    memoized Fibonacci functions on input n for attempts calls, both cold,
+    with the cache cleared before every call, and hot, with the value
+    already cached.  Prints the average time per call of each and returns
+    a dictionary mapping each function name to its (cold, hot) averages.
+    recursiveMemoizedFibonacci builds a new cache on every call, so it is
+    always cold.  n should be well below the recursion limit.
+    """
+    import timeit  # Import timeit only when timing.
+
+    # The memoized functions and a function to clear the cache of each.
+    functions = [(recursiveMemoizedFibonacci, lambda: None),
+                 (recursiveNativeMemoizedFibonacci,
+                  recursiveNativeMemoizedFibonacci.cache_clear),
+                 (memoizedFibonacci, fibonacciCache.clear)]
+    results = {}  # A dictionary to store the timing results.
+
+    # Loop for all functions and their cache clearing functions.
+    for function, clear in functions:
+
+        def cold():
+            """
+            A helper function to call the function with an empty cache.
+            """
+            clear()  # Clear the cache.
+            return function(n)  # Call and return the function.
+
+        # Time the function cold, then warm the cache and time it hot.
+        coldTime = timeit.timeit(cold, number=attempts) / attempts
+        function(n)
+        hotTime = timeit.timeit(wrapper(function, n),
+                                number=attempts) / attempts
+        results[function.__name__] = (coldTime, hotTime)
+        print(f"{function.__name__} ran for {coldTime} seconds cold and "
+              f"{hotTime} seconds hot on average over {attempts} calls.")
+
+    return results  # Return the timing results.
+
+
+if __name__ == "__main__":
+
+    # print(recursiveFibonacci(25))  # Test for correctness.
+    # print(fib(25))  # Test for correctness.
+    # print(next(fibRange(10, 20)))  # F(10), ..., F(19).
+
+    # A list of all Fibonacci Functions to time.
+    functions = [recursiveFibonacci, recursiveMemoizedFibonacci,
+                 recursiveNativeMemoizedFibonacci, memoizedFibonacci,
+                 recursiveMatrixFibonacci, generatorFibonacci,
+                 iterativeFibonacci, binetFibonacci, fib]
+
+    timeFibonacci(functions, 25, 30)  # Time the functions.
+    benchmarkMemoizedFibonacci(25, 30)  # Time the caches cold and hot.